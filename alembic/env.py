@@ -12,7 +12,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import User, Location, Category, Invoice, InvoiceImage
+from app.models import (
+    User, Location, Category, Invoice, InvoiceCount, InvoiceDailyStat, RollupWatermark,
+    InvoiceImage, ImageBlob, UploadSession
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,39 @@
+"""add keyset pagination indexes to invoices
+
+Revision ID: 1d7c4e9a0b35
+Revises: f3b6d0a4c218
+Create Date: 2026-10-18 13:21:52.880143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7c4e9a0b35'
+down_revision: Union[str, Sequence[str], None] = 'f3b6d0a4c218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_invoices_captured_at_id', ['captured_at', 'id']),
+    ('ix_invoices_user_id_captured_at_id', ['user_id', 'captured_at', 'id']),
+    ('ix_invoices_location_id_captured_at_id', ['location_id', 'captured_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build without locking out writes; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'invoices', columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='invoices', postgresql_concurrently=True, if_exists=True)
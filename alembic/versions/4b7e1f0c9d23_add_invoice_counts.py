@@ -0,0 +1,98 @@
+"""add invoice_counts maintained by triggers
+
+Revision ID: 4b7e1f0c9d23
+Revises: 8f2a5c6e1b94
+Create Date: 2026-10-18 15:02:41.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1f0c9d23'
+down_revision: Union[str, Sequence[str], None] = '8f2a5c6e1b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY = "COALESCE(location_id, '00000000-0000-0000-0000-000000000000'::uuid), COALESCE(category_id, 0), status"
+
+# Every insert, delete and change of location, category or status moves one count;
+# this covers the create path, status changes and ON DELETE CASCADE alike
+FUNCTIONS = [
+    f"""
+    CREATE FUNCTION invoice_counts_add(p_location_id uuid, p_category_id integer, p_status varchar, p_delta integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO invoice_counts (location_id, category_id, status, count)
+        VALUES (p_location_id, p_category_id, COALESCE(p_status, 'draft'), p_delta)
+        ON CONFLICT ({KEY}) DO UPDATE SET count = invoice_counts.count + EXCLUDED.count;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION invoice_counts_maintain() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM invoice_counts_add(OLD.location_id, OLD.category_id, OLD.status, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM invoice_counts_add(NEW.location_id, NEW.category_id, NEW.status, 1);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER invoice_counts_insert_delete
+    AFTER INSERT OR DELETE ON invoices
+    FOR EACH ROW EXECUTE FUNCTION invoice_counts_maintain()
+    """,
+    """
+    CREATE TRIGGER invoice_counts_update
+    AFTER UPDATE OF location_id, category_id, status ON invoices
+    FOR EACH ROW
+    WHEN (OLD.location_id IS DISTINCT FROM NEW.location_id
+          OR OLD.category_id IS DISTINCT FROM NEW.category_id
+          OR OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION invoice_counts_maintain()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('invoice_counts',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('location_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f'CREATE UNIQUE INDEX ux_invoice_counts_key ON invoice_counts ({KEY})')
+    op.create_index(op.f('ix_invoice_counts_location_id'), 'invoice_counts', ['location_id'], unique=False)
+    for statement in FUNCTIONS + TRIGGERS:
+        op.execute(statement)
+    # Creating the triggers locks out invoice writes until commit, so the backfill is consistent
+    op.execute("""
+        INSERT INTO invoice_counts (location_id, category_id, status, count)
+        SELECT location_id, category_id, COALESCE(status, 'draft'), count(*)
+        FROM invoices
+        GROUP BY location_id, category_id, COALESCE(status, 'draft')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS invoice_counts_update ON invoices')
+    op.execute('DROP TRIGGER IF EXISTS invoice_counts_insert_delete ON invoices')
+    op.execute('DROP FUNCTION IF EXISTS invoice_counts_maintain()')
+    op.execute('DROP FUNCTION IF EXISTS invoice_counts_add(uuid, integer, varchar, integer)')
+    op.drop_table('invoice_counts')
@@ -0,0 +1,28 @@
+"""add original_file_size to invoice_images
+
+Revision ID: 5c9e0b3a7d14
+Revises: d41f8a6c2e57
+Create Date: 2026-10-18 11:20:05.734210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9e0b3a7d14'
+down_revision: Union[str, Sequence[str], None] = 'd41f8a6c2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('invoice_images', sa.Column('original_file_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('invoice_images', 'original_file_size')
@@ -0,0 +1,51 @@
+"""add invoice filter and invoice_images foreign key indexes
+
+Revision ID: 8f2a5c6e1b94
+Revises: 1d7c4e9a0b35
+Create Date: 2026-10-18 13:47:09.361524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2a5c6e1b94'
+down_revision: Union[str, Sequence[str], None] = '1d7c4e9a0b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    # Image lookups by invoice and ON DELETE CASCADE from invoices
+    ('ix_invoice_images_invoice_id', 'invoice_images', ['invoice_id'], None),
+    ('ix_invoices_location_id_status_captured_at_id', 'invoices', ['location_id', 'status', 'captured_at', 'id'], None),
+    ('ix_invoices_status_captured_at_id', 'invoices', ['status', 'captured_at', 'id'], None),
+    ('ix_invoices_category_id_captured_at_id', 'invoices', ['category_id', 'captured_at', 'id'], None),
+    # Drafts are the small working set each device lists repeatedly
+    ('ix_invoices_user_id_captured_at_id_draft', 'invoices', ['user_id', 'captured_at', 'id'], "status = 'draft'"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+    op.execute('ANALYZE invoices')
+    op.execute('ANALYZE invoice_images')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,65 @@
+"""add invoice_daily_stats rollup and change-feed indexes
+
+Revision ID: 9c3a6e2d5f17
+Revises: 4b7e1f0c9d23
+Create Date: 2026-10-18 15:41:26.093418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3a6e2d5f17'
+down_revision: Union[str, Sequence[str], None] = '4b7e1f0c9d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY = (
+    "day, user_id, COALESCE(location_id, '00000000-0000-0000-0000-000000000000'::uuid), "
+    "COALESCE(category_id, 0), COALESCE(status, '')"
+)
+
+# (name, table, columns) built concurrently on the large tables
+INDEXES = [
+    ('ix_invoices_changed_at', 'invoices', [sa.text('COALESCE(updated_at, created_at)')]),
+    ('ix_invoice_images_created_at', 'invoice_images', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('invoice_daily_stats',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('location_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('invoices', sa.BigInteger(), nullable=False),
+    sa.Column('images', sa.BigInteger(), nullable=False),
+    sa.Column('image_bytes', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f'CREATE UNIQUE INDEX ux_invoice_daily_stats_key ON invoice_daily_stats ({KEY})')
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_table('rollup_watermarks')
+    op.drop_table('invoice_daily_stats')
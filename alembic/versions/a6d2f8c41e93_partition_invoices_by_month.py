@@ -0,0 +1,185 @@
+"""partition invoices and invoice_images by month
+
+Revision ID: a6d2f8c41e93
+Revises: 9c3a6e2d5f17
+Create Date: 2026-10-18 16:20:07.731592
+
+Rewrites both tables: writes are blocked (reads are not) while rows are copied
+and indexes rebuilt, so run it in a maintenance window.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f8c41e93'
+down_revision: Union[str, Sequence[str], None] = '9c3a6e2d5f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created ahead of today; scripts/manage_partitions.py keeps this up afterwards
+PREMAKE_MONTHS = 3
+
+INVOICE_COLUMNS = [
+    'id', 'user_id', 'location_id', 'category_id', 'status', 'note', 'extra_metadata',
+    'captured_at', 'created_at', 'updated_at',
+]
+
+IMAGE_COLUMNS = [
+    'id', 'invoice_id', 'file_path', 'content_sha256', 'file_name', 'file_size', 'original_file_size',
+    'mime_type', 'width', 'height', 'gps_latitude', 'gps_longitude', 'exif_gps_latitude',
+    'exif_gps_longitude', 'taken_at', 'created_at',
+]
+
+# (name, table, columns, partial index predicate); on a partitioned parent each is
+# created on every partition, present and future
+INDEXES = [
+    ('ix_invoices_captured_at_id', 'invoices', ['captured_at', 'id'], None),
+    ('ix_invoices_user_id_captured_at_id', 'invoices', ['user_id', 'captured_at', 'id'], None),
+    ('ix_invoices_location_id_captured_at_id', 'invoices', ['location_id', 'captured_at', 'id'], None),
+    ('ix_invoices_location_id_status_captured_at_id', 'invoices', ['location_id', 'status', 'captured_at', 'id'], None),
+    ('ix_invoices_status_captured_at_id', 'invoices', ['status', 'captured_at', 'id'], None),
+    ('ix_invoices_category_id_captured_at_id', 'invoices', ['category_id', 'captured_at', 'id'], None),
+    ('ix_invoices_user_id_captured_at_id_draft', 'invoices', ['user_id', 'captured_at', 'id'], "status = 'draft'"),
+    ('ix_invoices_changed_at', 'invoices', [sa.text('COALESCE(updated_at, created_at)')], None),
+    ('ix_invoice_images_invoice_id', 'invoice_images', ['invoice_id'], None),
+    ('ix_invoice_images_content_sha256', 'invoice_images', ['content_sha256'], None),
+    ('ix_invoice_images_taken_at', 'invoice_images', ['taken_at'], None),
+    ('ix_invoice_images_created_at', 'invoice_images', ['created_at'], None),
+]
+
+# Same as 4b7e1f0c9d23; dropping the old table dropped them
+TRIGGERS = [
+    """
+    CREATE TRIGGER invoice_counts_insert_delete
+    AFTER INSERT OR DELETE ON invoices
+    FOR EACH ROW EXECUTE FUNCTION invoice_counts_maintain()
+    """,
+    """
+    CREATE TRIGGER invoice_counts_update
+    AFTER UPDATE OF location_id, category_id, status ON invoices
+    FOR EACH ROW
+    WHEN (OLD.location_id IS DISTINCT FROM NEW.location_id
+          OR OLD.category_id IS DISTINCT FROM NEW.category_id
+          OR OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION invoice_counts_maintain()
+    """,
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(parent: str, table: str) -> None:
+    """Monthly partitions of parent, named after table, from the oldest invoice to PREMAKE_MONTHS ahead"""
+    bind = op.get_bind()
+    first, current = bind.execute(sa.text("""
+        SELECT date_trunc('month', min(COALESCE(captured_at, created_at)) AT TIME ZONE 'UTC')::date,
+               date_trunc('month', now() AT TIME ZONE 'UTC')::date
+        FROM invoices
+    """)).one()
+    month = min(first or current, current)
+    last = _add_months(current, PREMAKE_MONTHS)
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{following.isoformat()} 00:00:00+00')"
+        )
+        month = following
+
+
+def _create_indexes() -> None:
+    for name, table, columns, where in INDEXES:
+        op.create_index(name, table, columns, unique=False, postgresql_where=sa.text(where) if where else None)
+    op.create_foreign_key('invoices_user_id_fkey', 'invoices', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('invoices_location_id_fkey', 'invoices', 'locations', ['location_id'], ['id'])
+    op.create_foreign_key('invoices_category_id_fkey', 'invoices', 'categories', ['category_id'], ['id'])
+    op.create_foreign_key(
+        'invoice_images_content_sha256_fkey', 'invoice_images', 'image_blobs', ['content_sha256'], ['sha256']
+    )
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Readers keep going during the copy; writers wait until commit
+    op.execute('LOCK TABLE invoices, invoice_images IN EXCLUSIVE MODE')
+
+    op.execute('CREATE TABLE invoices_partitioned (LIKE invoices INCLUDING DEFAULTS) PARTITION BY RANGE (captured_at)')
+    op.execute('ALTER TABLE invoices_partitioned ALTER COLUMN captured_at SET NOT NULL')
+    op.execute(
+        'CREATE TABLE invoice_images_partitioned (LIKE invoice_images INCLUDING DEFAULTS) '
+        'PARTITION BY RANGE (invoice_captured_at)'
+    )
+    op.execute('ALTER TABLE invoice_images_partitioned ADD COLUMN invoice_captured_at timestamptz NOT NULL')
+    _create_partitions('invoices_partitioned', 'invoices')
+    _create_partitions('invoice_images_partitioned', 'invoice_images')
+
+    # Loading before the indexes exist is much faster than maintaining them row by row
+    columns = ', '.join(INVOICE_COLUMNS)
+    source = ', '.join(
+        'COALESCE(captured_at, created_at, now())' if column == 'captured_at' else column
+        for column in INVOICE_COLUMNS
+    )
+    op.execute(f'INSERT INTO invoices_partitioned ({columns}) SELECT {source} FROM invoices')
+    columns = ', '.join(IMAGE_COLUMNS)
+    source = ', '.join(f'ii.{column}' for column in IMAGE_COLUMNS)
+    op.execute(f"""
+        INSERT INTO invoice_images_partitioned ({columns}, invoice_captured_at)
+        SELECT {source}, i.captured_at
+        FROM invoice_images ii
+        JOIN invoices_partitioned i ON i.id = ii.invoice_id
+    """)
+
+    op.drop_table('invoice_images')
+    op.drop_table('invoices')
+    op.rename_table('invoices_partitioned', 'invoices')
+    op.rename_table('invoice_images_partitioned', 'invoice_images')
+
+    # Unique constraints on a partitioned table must include the partition key
+    op.create_primary_key('invoices_pkey', 'invoices', ['id', 'captured_at'])
+    op.create_primary_key('invoice_images_pkey', 'invoice_images', ['id', 'invoice_captured_at'])
+    op.create_foreign_key(
+        'invoice_images_invoice_id_invoice_captured_at_fkey', 'invoice_images', 'invoices',
+        ['invoice_id', 'invoice_captured_at'], ['id', 'captured_at'], ondelete='CASCADE'
+    )
+    _create_indexes()
+    op.execute('ANALYZE invoices')
+    op.execute('ANALYZE invoice_images')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Detached or expired months are not restored
+    op.execute('LOCK TABLE invoices, invoice_images IN EXCLUSIVE MODE')
+
+    op.execute('CREATE TABLE invoices_unpartitioned (LIKE invoices INCLUDING DEFAULTS)')
+    op.execute('ALTER TABLE invoices_unpartitioned ALTER COLUMN captured_at DROP NOT NULL')
+    op.execute('CREATE TABLE invoice_images_unpartitioned (LIKE invoice_images INCLUDING DEFAULTS)')
+    op.execute('ALTER TABLE invoice_images_unpartitioned DROP COLUMN invoice_captured_at')
+
+    columns = ', '.join(INVOICE_COLUMNS)
+    op.execute(f'INSERT INTO invoices_unpartitioned ({columns}) SELECT {columns} FROM invoices')
+    columns = ', '.join(IMAGE_COLUMNS)
+    op.execute(f'INSERT INTO invoice_images_unpartitioned ({columns}) SELECT {columns} FROM invoice_images')
+
+    op.drop_table('invoice_images')
+    op.drop_table('invoices')
+    op.rename_table('invoices_unpartitioned', 'invoices')
+    op.rename_table('invoice_images_unpartitioned', 'invoice_images')
+
+    op.create_primary_key('invoices_pkey', 'invoices', ['id'])
+    op.create_primary_key('invoice_images_pkey', 'invoice_images', ['id'])
+    op.create_foreign_key(
+        'invoice_images_invoice_id_fkey', 'invoice_images', 'invoices', ['invoice_id'], ['id'], ondelete='CASCADE'
+    )
+    _create_indexes()
+    op.execute('ANALYZE invoices')
+    op.execute('ANALYZE invoice_images')
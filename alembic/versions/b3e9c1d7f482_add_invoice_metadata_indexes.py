@@ -0,0 +1,61 @@
+"""add GIN indexes for invoice extra_metadata filters
+
+Revision ID: b3e9c1d7f482
+Revises: a6d2f8c41e93
+Create Date: 2026-10-18 17:03:52.184460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9c1d7f482'
+down_revision: Union[str, Sequence[str], None] = 'a6d2f8c41e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# jsonb_path_ops only hashes key paths together with their values, so it cannot answer
+# "has key"; a second, much smaller index over the top-level key names does
+KEYS_FUNCTION = """
+    CREATE FUNCTION invoice_meta_keys(meta jsonb) RETURNS text[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE WHEN jsonb_typeof(meta) = 'object' THEN ARRAY(SELECT jsonb_object_keys(meta)) END
+    $$
+"""
+
+# (name, definition after the table name)
+INDEXES = [
+    ('ix_invoices_extra_metadata', 'USING gin (extra_metadata jsonb_path_ops)'),
+    ('ix_invoices_meta_keys', 'USING gin (invoice_meta_keys(extra_metadata))'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(KEYS_FUNCTION)
+
+    # CONCURRENTLY is not allowed on a partitioned parent: build an invalid parent index
+    # ON ONLY invoices, then each partition's concurrently, and attach them
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        partitions = bind.execute(sa.text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'invoices'::regclass"
+        )).scalars().all()
+        for name, definition in INDEXES:
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON ONLY invoices {definition}')
+            suffix = name.removeprefix('ix_invoices_')
+            for partition in partitions:
+                child = f'{partition}_{suffix}'
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}')
+                op.execute(f'ALTER INDEX {name} ATTACH PARTITION {child}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the parent index drops the attached partition indexes
+    for name, _ in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    op.execute('DROP FUNCTION IF EXISTS invoice_meta_keys(jsonb)')
@@ -0,0 +1,47 @@
+"""add upload_sessions for resumable uploads
+
+Revision ID: b7e2c4d91f03
+Revises: 643b82d33fd9
+Create Date: 2026-10-18 09:12:40.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4d91f03'
+down_revision: Union[str, Sequence[str], None] = '643b82d33fd9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('note', sa.Text(), nullable=True),
+    sa.Column('invoice_status', sa.String(length=20), nullable=True),
+    sa.Column('file_name', sa.String(length=255), nullable=True),
+    sa.Column('mime_type', sa.String(length=50), nullable=True),
+    sa.Column('upload_length', sa.BigInteger(), nullable=False),
+    sa.Column('upload_offset', sa.BigInteger(), nullable=False),
+    sa.Column('temp_path', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_sessions_expires_at'), 'upload_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_sessions_expires_at'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
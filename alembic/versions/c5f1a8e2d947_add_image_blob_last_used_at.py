@@ -0,0 +1,36 @@
+"""add last_used_at to image_blobs for a blob GC grace period
+
+Revision ID: c5f1a8e2d947
+Revises: b3e9c1d7f482
+Create Date: 2026-10-18 19:41:07.326518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a8e2d947'
+down_revision: Union[str, Sequence[str], None] = 'b3e9c1d7f482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('image_blobs', sa.Column(
+        'last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+    ))
+    # cleanup_uploads only looks at the few unreferenced blobs
+    op.create_index(
+        'ix_image_blobs_unreferenced', 'image_blobs', ['last_used_at'], unique=False,
+        postgresql_where=sa.text('ref_count <= 0')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_image_blobs_unreferenced', table_name='image_blobs')
+    op.drop_column('image_blobs', 'last_used_at')
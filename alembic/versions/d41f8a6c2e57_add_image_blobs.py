@@ -0,0 +1,42 @@
+"""add image_blobs for content-addressed storage
+
+Revision ID: d41f8a6c2e57
+Revises: b7e2c4d91f03
+Create Date: 2026-10-18 10:03:12.581904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f8a6c2e57'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c4d91f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('image_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('file_path', sa.Text(), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('mime_type', sa.String(length=50), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('invoice_images', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_invoice_images_content_sha256'), 'invoice_images', ['content_sha256'], unique=False)
+    op.create_foreign_key(None, 'invoice_images', 'image_blobs', ['content_sha256'], ['sha256'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('invoice_images_content_sha256_fkey', 'invoice_images', type_='foreignkey')
+    op.drop_index(op.f('ix_invoice_images_content_sha256'), table_name='invoice_images')
+    op.drop_column('invoice_images', 'content_sha256')
+    op.drop_table('image_blobs')
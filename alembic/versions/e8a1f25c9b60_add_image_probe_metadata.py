@@ -0,0 +1,38 @@
+"""add probed image metadata to invoice_images
+
+Revision ID: e8a1f25c9b60
+Revises: 5c9e0b3a7d14
+Create Date: 2026-10-18 12:02:41.518903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a1f25c9b60'
+down_revision: Union[str, Sequence[str], None] = '5c9e0b3a7d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('invoice_images', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('invoice_images', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('invoice_images', sa.Column('exif_gps_latitude', sa.Numeric(precision=9, scale=6), nullable=True))
+    op.add_column('invoice_images', sa.Column('exif_gps_longitude', sa.Numeric(precision=9, scale=6), nullable=True))
+    op.add_column('invoice_images', sa.Column('taken_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_invoice_images_taken_at'), 'invoice_images', ['taken_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_invoice_images_taken_at'), table_name='invoice_images')
+    op.drop_column('invoice_images', 'taken_at')
+    op.drop_column('invoice_images', 'exif_gps_longitude')
+    op.drop_column('invoice_images', 'exif_gps_latitude')
+    op.drop_column('invoice_images', 'height')
+    op.drop_column('invoice_images', 'width')
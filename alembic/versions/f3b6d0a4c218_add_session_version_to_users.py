@@ -0,0 +1,28 @@
+"""add session_version to users
+
+Revision ID: f3b6d0a4c218
+Revises: e8a1f25c9b60
+Create Date: 2026-10-18 12:48:13.204617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b6d0a4c218'
+down_revision: Union[str, Sequence[str], None] = 'e8a1f25c9b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('session_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'session_version')
@@ -2,7 +2,7 @@
 API Routes
 """
 from fastapi import APIRouter
-from app.api.routes import auth, users, locations, categories, invoices
+from app.api.routes import auth, users, locations, categories, invoices, uploads, images, reports
 
 # Create main API router
 api_router = APIRouter()
@@ -13,6 +13,9 @@ api_router.include_router(users.router)
 api_router.include_router(locations.router)
 api_router.include_router(categories.router)
 api_router.include_router(invoices.router)
+api_router.include_router(uploads.router)
+api_router.include_router(images.router)
+api_router.include_router(reports.router)
 
 __all__ = ['api_router']
 
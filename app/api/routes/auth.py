@@ -1,21 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.replica import get_read_db
 from app.core.security import create_tokens, verify_token
 from app.core.deps import get_current_user
+from app.core.last_login import last_login_buffer
+from app.core.passwords import PasswordHasherBusyError
+from app.core.rate_limit import TokenBucketLimiter
+from app.core.session_registry import get_session_state
+from app.core.user_cache import AuthUser
 from app.schemas import user as user_schemas
 from app.crud import user as user_crud
-from app.models.user import User
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+# Login attempts are throttled before any bcrypt work is done
+username_limiter = TokenBucketLimiter(
+    "login_username",
+    capacity=settings.LOGIN_BURST_PER_USERNAME,
+    rate=settings.LOGIN_RATE_PER_USERNAME / 60,
+    max_keys=settings.LOGIN_RATE_MAX_KEYS
+)
+ip_limiter = TokenBucketLimiter(
+    "login_ip",
+    capacity=settings.LOGIN_BURST_PER_IP,
+    rate=settings.LOGIN_RATE_PER_IP / 60,
+    max_keys=settings.LOGIN_RATE_MAX_KEYS
+)
+
+
+def _throttle_login(request: Request, username: str) -> None:
+    """Raise 429 when the client address or the username has run out of login attempts"""
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client address
+    client_ip = request.client.host if request.client else "unknown"
+    wait = ip_limiter.acquire(client_ip) or username_limiter.acquire(username.lower())
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
 
 @router.post("/login", response_model=user_schemas.Token)
-def login(credentials: user_schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: user_schemas.UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Authenticate a user and return access and refresh tokens"""
-    user = user_crud.authenticate_user(db, username=credentials.username, password=credentials.password)
+    _throttle_login(request, credentials.username)
+    try:
+        user = await user_crud.authenticate_user(db, username=credentials.username, password=credentials.password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,17 +72,17 @@ def login(credentials: user_schemas.UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
-    # Update last login
-    user_crud.update_last_login(db, user_id=user.id)
+    # Update last login; written in bulk by the background flusher
+    last_login_buffer.record(user.id)
     
     # Create and return tokens
-    tokens = create_tokens(user_id=user.id, username=user.username)
+    tokens = create_tokens(user_id=user.id, username=user.username, session_version=user.session_version)
     return tokens
 
 
 @router.post("/refresh", response_model=user_schemas.Token)
-def refresh_access_token(refresh_request: user_schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
-    """Refresh access token using refresh token"""
+async def refresh_access_token(refresh_request: user_schemas.RefreshTokenRequest):
+    """Refresh access token using refresh token (checked against the in-memory session registry)"""
     # Verify refresh token
     payload = verify_token(refresh_request.refresh_token, token_type="refresh")
     if payload is None:
@@ -50,30 +92,59 @@ def refresh_access_token(refresh_request: user_schemas.RefreshTokenRequest, db:
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = uuid.UUID(payload.get("sub"))
+    try:
+        user_id = uuid.UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token format",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     username = payload.get("username")
+    session_version = payload.get("sv", 1)
     
     # Verify user still exists
-    user = user_crud.get_user(db, user_id=user_id)
-    if user is None or user.username != username:
+    state = await get_session_state(user_id)
+    if state is None or state.username != username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or username mismatch"
         )
     
     # Check if user is active
-    if not user.is_active:
+    if not state.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
     
+    # Reject tokens from before the user's sessions were revoked
+    if state.session_version != session_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     # Create and return new tokens
-    tokens = create_tokens(user_id=user.id, username=user.username)
+    tokens = create_tokens(user_id=user_id, username=username, session_version=session_version)
     return tokens
 
 
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all_sessions(current_user: AuthUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Revoke every access and refresh token of the current user"""
+    user = await user_crud.get_user(db, user_id=current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    await user_crud.bump_session_version(db, user)
+
+
 @router.get("/me", response_model=user_schemas.UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: AuthUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     """Get current authenticated user information"""
-    return current_user
+    # The cached auth user only carries auth fields; the response needs the full profile
+    user = await user_crud.get_user(db, user_id=current_user.id, with_location=True)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
@@ -1,46 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.database import get_async_db
+from app.core.replica import get_read_db
+from app.core.bulk_import import ImportFormatError, detect_format
+from app.core.deps import get_current_admin_user, get_current_user
+from app.core.user_cache import AuthUser
 from app.schemas import category as category_schemas
+from app.schemas.bulk_import import ImportResult
+from app.crud import bulk_import as bulk_import_crud
 from app.crud import category as category_crud
-from app.models.user import User
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
 @router.post("/", response_model=category_schemas.CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category: category_schemas.CategoryCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new category"""
     # Check if code already exists
     if category.code:
-        db_category = category_crud.get_category_by_code(db, code=category.code)
+        db_category = await category_crud.get_category_by_code(db, code=category.code)
         if db_category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category code already exists"
             )
     
-    return category_crud.create_category(db=db, category=category)
+    return await category_crud.create_category(db=db, category=category)
 
 
 @router.get("/", response_model=List[category_schemas.CategoryResponse])
-def list_categories(
+async def list_categories(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = Query(False, description="Filter only active categories"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of categories"""
-    categories = category_crud.get_categories(db, skip=skip, limit=limit, active_only=active_only)
+    categories = await category_crud.get_categories(db, skip=skip, limit=limit, active_only=active_only)
     return categories
 
 
-
+@router.post("/import", response_model=ImportResult)
+async def import_categories(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the upload when omitted"),
+    current_user: AuthUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Insert or update categories in bulk, matched on code (admin only)
+    Invalid rows are skipped and listed by line in the report; the rest are applied together
+    """
+    try:
+        fmt = detect_format(format, file.filename, file.content_type)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await bulk_import_crud.import_categories(db, file.file, fmt)
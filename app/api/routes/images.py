@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import os
+import uuid
+
+from app.core.config import settings
+from app.core.replica import get_read_db
+from app.core.deps import get_current_user
+from app.core.user_cache import AuthUser
+from app.core.downloads import IMMUTABLE_CACHE_CONTROL, RangeFileResponse, parse_range
+from app.core.storage import get_storage
+from app.crud import invoice as invoice_crud
+from app.models.invoice_image import InvoiceImage
+
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+
+def _can_view(user: AuthUser, image: InvoiceImage) -> bool:
+    """Admins see everything; staff see their own invoices and those of their location"""
+    invoice = image.invoice
+    if user.role == "admin" or invoice.user_id == user.id:
+        return True
+    return user.location_id is not None and invoice.location_id == user.location_id
+
+
+def _etag(image: InvoiceImage) -> str:
+    """Strong validator: the content hash, or the image id for pre-hash uploads"""
+    return f'"{image.content_sha256 or image.id}"'
+
+
+@router.get("/{image_id}")
+async def download_image(
+    image_id: uuid.UUID,
+    request: Request,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Download an invoice image with Range, ETag and long-lived caching support"""
+    image = await invoice_crud.get_invoice_image(db, image_id=image_id)
+    if image is None or not _can_view(current_user, image):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    etag = _etag(image)
+    media_type = image.mime_type or "application/octet-stream"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Content-addressed images store a backend key; older images store a local path
+    key = image.file_path
+    is_blob = image.content_sha256 is not None
+    storage = get_storage()
+
+    # Let the front proxy send the bytes; it handles Range itself
+    if settings.ACCEL_REDIRECT_PREFIX and (not is_blob or storage.local_path(key) is not None):
+        relative = key if is_blob else os.path.relpath(key, settings.UPLOAD_DIR)
+        headers["X-Accel-Redirect"] = settings.ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative.replace(os.sep, "/")
+        return Response(headers=headers, media_type=media_type)
+
+    path = storage.local_path(key) if is_blob else key
+    if path is None:
+        # Object storage: hand the client a short-lived direct URL
+        url = storage.presigned_url(key, expires_in=settings.S3_PRESIGNED_URL_TTL)
+        return RedirectResponse(url, status_code=status.HTTP_302_FOUND, headers={"Cache-Control": "private, no-store"})
+
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image file missing")
+    file_size = stat_result.st_size
+
+    # A Range only applies if the client's copy is still the current one
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, file_size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{file_size}"}
+        )
+
+    if byte_range is not None:
+        start, end = byte_range
+        return RangeFileResponse(path, start, end, file_size, headers=headers, media_type=media_type)
+
+    # Servers implementing the ASGI path-send extension send this without Python reading the file
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
@@ -1,30 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import json
 import uuid
-import os
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.replica import get_read_db
 from app.core.deps import get_current_user
+from app.core.user_cache import AuthUser
+from app.core.image_probe import UnsupportedImageError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.uploads import UploadTooLargeError, save_upload_files
 from app.schemas import invoice as invoice_schemas
 from app.crud import invoice as invoice_crud
+from app.crud import invoice_count as invoice_count_crud
 from app.crud import location as location_crud
-from app.models.user import User
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
+META_DESCRIPTION = (
+    "Filter on extra_metadata, repeatable: a JSON object the metadata must contain "
+    "(e.g. {\"KTSSS\": true}) or a key that must be present (e.g. Biên bản)"
+)
+
+
+def _parse_meta(values: List[str]) -> tuple[dict, list[str]]:
+    """Split meta query values into one containment object and a list of required keys"""
+    contains, keys = {}, []
+    for value in values:
+        if value.lstrip().startswith("{"):
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"meta is not valid JSON: {value}")
+            if not isinstance(parsed, dict):
+                raise HTTPException(status_code=400, detail="meta JSON must be an object")
+            contains.update(parsed)
+        elif value.strip():
+            keys.append(value.strip())
+    return contains, keys
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_invoice(
     category_id: Optional[int] = Form(None),
     note: Optional[str] = Form(None),
     status: str = Form("draft"),
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    file: Optional[UploadFile] = File(None),
+    files: List[UploadFile] = File([]),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new invoice with an image (auto-assigned to current user)"""
-    # 1. Create Invoice
+    """Create a new invoice with one or more images (auto-assigned to current user)"""
+    # Accept the legacy single "file" field alongside the "files" list
+    uploads = ([file] if file is not None else []) + list(files)
+    if not uploads:
+        raise HTTPException(status_code=400, detail="At least one image file is required")
+    if len(uploads) > settings.MAX_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_UPLOAD_FILES} images can be attached to an invoice"
+        )
+
     # Get location from user
     if not current_user.location_id:
         raise HTTPException(
@@ -35,13 +73,7 @@ async def create_invoice(
     location_id = current_user.location_id
     
     # Get GPS from location
-    gps_latitude = None
-    gps_longitude = None
-    
-    location = location_crud.get_location(db, location_id=location_id)
-    if location:
-        gps_latitude = float(location.gps_latitude) if location.gps_latitude is not None else None
-        gps_longitude = float(location.gps_longitude) if location.gps_longitude is not None else None
+    gps_latitude, gps_longitude = await location_crud.get_location_gps(db, location_id=location_id)
 
     # Add GPS to extra_metadata if provided
     extra_metadata = {}
@@ -57,74 +89,135 @@ async def create_invoice(
         status=status,
         extra_metadata=extra_metadata
     )
-    db_invoice = invoice_crud.create_invoice(db=db, invoice=invoice_data, user_id=current_user.id)
     
-    # 2. Save Image
+    # 1. Save Images
     try:
-        # Save file to uploads directory organized by year/month
-        from datetime import datetime
-        now = datetime.now()
-        upload_dir = os.path.join("uploads", str(now.year), f"{now.month:02d}")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        file_ext = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-            file_size = len(content)
-        
-        # 3. Create Image Record
-        invoice_crud.add_invoice_image(
+        # Stream all files into content-addressed storage concurrently
+        blobs = await save_upload_files(uploads)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedImageError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving images: {str(e)}")
+    
+    # 2. Create Invoice and Image Records in a single transaction
+    try:
+        db_invoice = await invoice_crud.create_invoice_with_images(
             db=db,
-            invoice_id=db_invoice.id,
-            file_path=file_path,
-            file_name=file.filename,
-            file_size=file_size,
-            mime_type=file.content_type,
-            gps_latitude=gps_latitude,
-            gps_longitude=gps_longitude
+            invoice=invoice_data,
+            user_id=current_user.id,
+            images=[
+                {
+                    **blob.image_fields(),
+                    "file_name": upload.filename,
+                    "gps_latitude": gps_latitude,
+                    "gps_longitude": gps_longitude,
+                }
+                for upload, blob in zip(uploads, blobs)
+            ]
         )
-        
-        # Refresh invoice to include images
-        db.refresh(db_invoice)
-        
-        # Validate model to ensure structure is correct
-        validated = invoice_schemas.InvoiceWithImages.model_validate(db_invoice)
-        return validated.model_dump()
-        
     except Exception as e:
+        # Blobs stored for this request stay unreferenced and are left to cleanup_uploads
         raise HTTPException(status_code=500, detail=f"Error creating invoice: {str(e)}")
+    
+    # Validate model to ensure structure is correct
+    validated = invoice_schemas.InvoiceWithImages.model_validate(db_invoice)
+    return validated.model_dump()
 
 
 
-@router.get("/", response_model=List[invoice_schemas.InvoiceResponse])
-def list_invoices(
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/", response_model=List[invoice_schemas.InvoiceListItem], response_model_exclude_unset=True)
+async def list_invoices(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Rows to skip (deprecated, use cursor)"),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
     user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
     location_id: Optional[uuid.UUID] = Query(None, description="Filter by location ID"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    meta: List[str] = Query([], description=META_DESCRIPTION),
+    include: Optional[str] = Query(None, description="Related data to embed, comma-separated: images, location, category"),
+    with_counts: bool = Query(False, description="Add X-Total-Count and X-Count-Source headers"),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get list of invoices with optional filters (requires authentication)"""
-    invoices = invoice_crud.get_invoices(
+    """
+    Get list of invoices with optional filters (requires authentication)
+    When more rows exist, the X-Next-Cursor header holds the cursor for the next page
+    Fields named in include are added to each row; others are left out
+    meta filters are served by GIN indexes on extra_metadata
+    with_counts adds the total for the filters; GET /invoices/counts has the per-status and per-category facets
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    includes = list(dict.fromkeys(name.strip() for name in include.split(",") if name.strip())) if include else []
+    meta_contains, meta_keys = _parse_meta(meta)
+    unknown = [name for name in includes if name not in invoice_crud.INVOICE_INCLUDES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(unknown)}; expected {', '.join(invoice_crud.INVOICE_INCLUDES)}"
+        )
+
+    # One extra row tells us whether there is a next page
+    invoices = await invoice_crud.get_invoices(
         db,
         skip=skip,
-        limit=limit,
+        limit=limit + 1,
         user_id=user_id,
         location_id=location_id,
         category_id=category_id,
-        status=status
+        status=status,
+        after=after,
+        include=includes,
+        meta_contains=meta_contains,
+        meta_keys=meta_keys
     )
-    return invoices
-
+    if len(invoices) > limit:
+        invoices = invoices[:limit]
+        last = invoices[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.captured_at, last.id)
 
+    if with_counts:
+        counts = await invoice_count_crud.get_invoice_counts(
+            db, user_id=user_id, location_id=location_id, category_id=category_id, status=status,
+            meta_contains=meta_contains, meta_keys=meta_keys
+        )
+        response.headers["X-Total-Count"] = str(counts["total"])
+        response.headers["X-Count-Source"] = counts["source"]
 
+    # Only loaded relationships are read; touching the others would lazy load per row
+    return [
+        {
+            **invoice_schemas.InvoiceResponse.model_validate(invoice).model_dump(),
+            **{name: getattr(invoice, name) for name in includes},
+        }
+        for invoice in invoices
+    ]
 
 
+@router.get("/counts", response_model=invoice_schemas.InvoiceCounts)
+async def count_invoices(
+    user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
+    location_id: Optional[uuid.UUID] = Query(None, description="Filter by location ID"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    meta: List[str] = Query([], description=META_DESCRIPTION),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Total and per-status / per-category counts for the same filters as the invoice list
+    Counts are exact for selective filters and maintained or estimated otherwise, so the
+    cost does not grow with the table; source says which was used
+    """
+    meta_contains, meta_keys = _parse_meta(meta)
+    return await invoice_count_crud.get_invoice_counts(
+        db, user_id=user_id, location_id=location_id, category_id=category_id, status=status,
+        meta_contains=meta_contains, meta_keys=meta_keys
+    )
@@ -1,52 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.database import get_async_db
+from app.core.replica import get_read_db
+from app.core.bulk_import import ImportFormatError, detect_format
+from app.core.deps import get_current_admin_user, get_current_user
+from app.core.user_cache import AuthUser
 from app.schemas import location as location_schemas
+from app.schemas.bulk_import import ImportResult
+from app.crud import bulk_import as bulk_import_crud
 from app.crud import location as location_crud
-from app.models.user import User
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 
 @router.post("/", response_model=location_schemas.LocationResponse, status_code=status.HTTP_201_CREATED)
-def create_location(
+async def create_location(
     location: location_schemas.LocationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new location"""
     # Check if code already exists
     if location.code:
-        db_location = location_crud.get_location_by_code(db, code=location.code)
+        db_location = await location_crud.get_location_by_code(db, code=location.code)
         if db_location:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Location code already exists"
             )
     
-    return location_crud.create_location(db=db, location=location)
+    return await location_crud.create_location(db=db, location=location)
 
 
 @router.get("/", response_model=List[location_schemas.LocationResponse])
-def list_locations(
+async def list_locations(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of locations"""
-    locations = location_crud.get_locations(db, skip=skip, limit=limit)
+    locations = await location_crud.get_locations(db, skip=skip, limit=limit)
     return locations
 
 
-
-
-
-
-
-
-
+@router.post("/import", response_model=ImportResult)
+async def import_locations(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the upload when omitted"),
+    current_user: AuthUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Insert or update locations in bulk, matched on code (admin only)
+    Invalid rows are skipped and listed by line in the report; the rest are applied together
+    """
+    try:
+        fmt = detect_format(format, file.filename, file.content_type)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await bulk_import_crud.import_locations(db, file.file, fmt)
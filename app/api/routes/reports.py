@@ -0,0 +1,57 @@
+from datetime import date
+from typing import List, Optional
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.replica import get_read_db
+from app.core.user_cache import AuthUser
+from app.crud import invoice_stats as invoice_stats_crud
+from app.schemas.report import DailyStatsRow
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/daily", response_model=List[DailyStatsRow], response_model_exclude_unset=True)
+async def daily_report(
+    start: date = Query(..., description="First day, inclusive"),
+    end: date = Query(..., description="Last day, inclusive"),
+    group_by: str = Query("day", description="Comma-separated: day, location_id, category_id, user_id, status"),
+    location_id: Optional[uuid.UUID] = Query(None, description="Filter by location ID"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Invoice, image and storage totals per group between start and end
+    Read from the invoice_daily_stats rollup, so figures lag by up to one refresh
+    Days are captured_at dates in REPORTING_TIMEZONE
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days + 1 > settings.REPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.REPORT_MAX_DAYS} days can be reported at once")
+
+    groups = list(dict.fromkeys(name.strip() for name in group_by.split(",") if name.strip()))
+    unknown = [name for name in groups if name not in invoice_stats_crud.STAT_DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by: {', '.join(unknown)}; expected {', '.join(invoice_stats_crud.STAT_DIMENSIONS)}"
+        )
+
+    return await invoice_stats_crud.get_daily_stats(
+        db,
+        start,
+        end,
+        group_by=groups,
+        location_id=location_id,
+        category_id=category_id,
+        user_id=user_id,
+        status=status
+    )
@@ -0,0 +1,250 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timezone
+import uuid
+import os
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.deps import get_current_user
+from app.core.user_cache import AuthUser
+from app.core.image_probe import UnsupportedImageError
+from app.core.uploads import (
+    UploadTooLargeError, append_staged, remove_files, stage_stream, store_file_as_blob
+)
+from app.schemas import invoice as invoice_schemas
+from app.schemas import upload_session as upload_schemas
+from app.crud import invoice as invoice_crud
+from app.crud import location as location_crud
+from app.crud import upload_session as upload_crud
+from app.models.upload_session import UploadSession
+
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+# Content type required for PATCH bodies, as in the tus protocol
+OFFSET_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+async def _get_active_session(db: AsyncSession, session_id: uuid.UUID, user: AuthUser) -> UploadSession:
+    """Load an upload session owned by the user, rejecting missing or expired ones"""
+    upload = await upload_crud.get_upload_session(db, session_id=session_id, user_id=user.id)
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if upload.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload session expired")
+    return upload
+
+
+def _offset_headers(upload: UploadSession) -> dict:
+    """Headers describing the progress of an upload session"""
+    return {
+        "Upload-Offset": str(upload.upload_offset),
+        "Upload-Length": str(upload.upload_length),
+        "Upload-Expires": upload.expires_at.isoformat(),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("/", response_model=upload_schemas.UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    upload: upload_schemas.UploadSessionCreate,
+    request: Request,
+    response: Response,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a resumable upload for an invoice photo"""
+    if upload.upload_length > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+    db_upload = await upload_crud.create_upload_session(db, upload=upload, user_id=current_user.id)
+    response.headers.update(_offset_headers(db_upload))
+    response.headers["Location"] = str(request.url_for("get_upload_offset", session_id=str(db_upload.id)))
+    return db_upload
+
+
+@router.head("/{session_id}")
+async def get_upload_offset(
+    session_id: uuid.UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Report how many bytes of an upload the server has received"""
+    upload = await _get_active_session(db, session_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=_offset_headers(upload))
+
+
+@router.patch("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    session_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Append a byte range to an upload, starting at the offset the server reported
+    The body is staged in its own file and only copied into the partial file while this
+    request holds the offset update, so concurrent PATCHes at the same offset cannot
+    interleave their bytes; the loser gets 409
+    """
+    if request.headers.get("content-type") != OFFSET_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be {OFFSET_CONTENT_TYPE}"
+        )
+
+    upload = await _get_active_session(db, session_id, current_user)
+    if upload_offset != upload.upload_offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload-Offset does not match server offset",
+            headers=_offset_headers(upload)
+        )
+
+    temp_path = upload.temp_path
+    remaining = upload.upload_length - upload.upload_offset
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > remaining:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk exceeds announced Upload-Length"
+        )
+
+    # Release the pooled connection while the (possibly slow) body streams in
+    await db.close()
+
+    try:
+        staged_path, written = await stage_stream(request.stream(), remaining)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk exceeds announced Upload-Length"
+        )
+
+    new_offset = upload_offset + written
+    try:
+        moved = await upload_crud.advance_upload_offset(
+            db, session_id, expected_offset=upload_offset, new_offset=new_offset, commit=False
+        )
+        if not moved:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload was modified by another request"
+            )
+        # The row lock taken by the update is held until commit
+        await run_in_threadpool(append_staged, staged_path, temp_path, upload_offset)
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await run_in_threadpool(remove_files, [staged_path])
+
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Upload-Offset": str(new_offset), "Cache-Control": "no-store"}
+    )
+
+
+@router.post("/{session_id}/finalize", status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    session_id: uuid.UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Turn a completed upload into an invoice with its image"""
+    upload = await _get_active_session(db, session_id, current_user)
+    if upload.upload_offset < upload.upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is not complete",
+            headers=_offset_headers(upload)
+        )
+    # Never store a partial file that disagrees with the recorded offset
+    temp_path = upload.temp_path
+    try:
+        received = await run_in_threadpool(os.path.getsize, temp_path)
+    except FileNotFoundError:
+        received = None
+    if received != upload.upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Uploaded data does not match Upload-Length; start a new upload"
+        )
+
+    if not current_user.location_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User must be assigned to a location to create invoices"
+        )
+
+    gps_latitude, gps_longitude = await location_crud.get_location_gps(db, location_id=current_user.location_id)
+    extra_metadata = {}
+    if gps_latitude is not None:
+        extra_metadata["gps_latitude"] = gps_latitude
+    if gps_longitude is not None:
+        extra_metadata["gps_longitude"] = gps_longitude
+
+    invoice_data = invoice_schemas.InvoiceCreate(
+        location_id=current_user.location_id,
+        category_id=upload.category_id,
+        note=upload.note,
+        status=upload.invoice_status,
+        extra_metadata=extra_metadata
+    )
+
+    # Link the completed partial file into content-addressed storage; the partial
+    # file is kept until the invoice commits so a failed finalize can be retried
+    try:
+        blob = await run_in_threadpool(store_file_as_blob, temp_path, keep_source=True)
+    except UnsupportedImageError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+
+    # The session row is removed in the same transaction that creates the invoice
+    try:
+        await upload_crud.delete_upload_session(db, upload, commit=False)
+        db_invoice = await invoice_crud.create_invoice_with_images(
+            db=db,
+            invoice=invoice_data,
+            user_id=current_user.id,
+            images=[{
+                **blob.image_fields(),
+                "file_name": upload.file_name,
+                "gps_latitude": gps_latitude,
+                "gps_longitude": gps_longitude,
+            }]
+        )
+    except Exception:
+        # The blob is left to cleanup_uploads if nothing ends up referencing it
+        await db.rollback()
+        raise
+
+    await run_in_threadpool(remove_files, [temp_path])
+
+    validated = invoice_schemas.InvoiceWithImages.model_validate(db_invoice)
+    return validated.model_dump()
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    session_id: uuid.UUID,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Abandon an upload and discard the bytes received so far"""
+    upload = await upload_crud.get_upload_session(db, session_id=session_id, user_id=current_user.id)
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    temp_path = upload.temp_path
+    await upload_crud.delete_upload_session(db, upload)
+    await run_in_threadpool(remove_files, [temp_path])
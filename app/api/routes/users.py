@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.database import get_async_db
+from app.core.replica import get_read_db
+from app.core.bulk_import import ImportFormatError, detect_format
+from app.core.deps import get_current_admin_user, get_current_user
+from app.core.passwords import PasswordHasherBusyError
+from app.core.user_cache import AuthUser
 from app.schemas import user as user_schemas
+from app.schemas.bulk_import import ImportResult
+from app.crud import bulk_import as bulk_import_crud
 from app.crud import user as user_crud
-from app.models.user import User
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/", response_model=user_schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: user_schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user (public endpoint for registration)"""
     # Check if username already exists
-    db_user = user_crud.get_user_by_username(db, username=user.username)
+    db_user = await user_crud.get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,26 +29,48 @@ def create_user(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    db_user = user_crud.get_user_by_email(db, email=user.email)
+    db_user = await user_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    return user_crud.create_user(db=db, user=user)
+    try:
+        return await user_crud.create_user(db=db, user=user)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.get("/", response_model=List[user_schemas.UserResponse])
-def list_users(
+async def list_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of users (requires authentication)"""
-    users = user_crud.get_users(db, skip=skip, limit=limit)
+    users = await user_crud.get_users(db, skip=skip, limit=limit)
     return users
 
 
-
+@router.post("/import", response_model=ImportResult)
+async def import_users(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the upload when omitted"),
+    current_user: AuthUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Insert or update users in bulk, matched on username (admin only)
+    Invalid rows are skipped and listed by line in the report; the rest are applied together
+    """
+    try:
+        fmt = detect_format(format, file.filename, file.content_type)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await bulk_import_crud.import_users(db, file.file, fmt)
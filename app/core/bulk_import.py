@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+FORMATS = ("csv", "ndjson")
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+class ImportFormatError(ValueError):
+    """Raised when the format of an import file cannot be determined"""
+
+
+class ImportReport:
+    """Outcome of a bulk import; only the first BULK_IMPORT_MAX_ERRORS row errors are kept"""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def add_error(self, line: int, errors: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.BULK_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+
+def detect_format(explicit: Optional[str], filename: Optional[str], content_type: Optional[str]) -> str:
+    """Pick csv or ndjson from an explicit choice, the content type or the file extension"""
+    if explicit:
+        if explicit.lower() not in FORMATS:
+            raise ImportFormatError(f"Unsupported format '{explicit}', expected one of {', '.join(FORMATS)}")
+        return explicit.lower()
+    if content_type:
+        fmt = _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        for extension, fmt in _EXTENSIONS.items():
+            if filename.lower().endswith(extension):
+                return fmt
+    raise ImportFormatError("Cannot tell the file format; pass format=csv or format=ndjson")
+
+
+def _iter_records(file: BinaryIO, fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """(line, record, parse error) for each record, reading the file incrementally"""
+    text_file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        # csv.reader rather than DictReader, which skips blank lines without counting them
+        reader = csv.reader(text_file)
+        fieldnames = [name.strip() for name in next(reader, [])]
+        while True:
+            # Report the line a record starts on; quoted cells may span several
+            start = reader.line_num + 1
+            row = next(reader, None)
+            if row is None:
+                break
+            if not row:
+                continue
+            # Empty and missing cells mean "not set", so optional fields validate as None
+            yield start, {
+                name: (row[index] if index < len(row) and row[index] != "" else None)
+                for index, name in enumerate(fieldnames)
+            }, None
+        return
+
+    for line, raw in enumerate(text_file, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            yield line, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line, None, "Each line must be a JSON object"
+            continue
+        yield line, record, None
+
+
+def validated_batches(
+    file: BinaryIO,
+    fmt: str,
+    schema: Type[BaseModel],
+    report: ImportReport,
+    batch_size: Optional[int] = None
+) -> Iterator[list[tuple[int, BaseModel]]]:
+    """
+    Parse and validate an import file in batches of (line, model)
+    Invalid rows are recorded on the report instead of being yielded
+    This is blocking; drive it from a worker thread
+    """
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    batch: list[tuple[int, BaseModel]] = []
+    for line, record, error in _iter_records(file, fmt):
+        report.processed += 1
+        if error is not None:
+            report.add_error(line, [error])
+            continue
+        try:
+            batch.append((line, schema.model_validate(record)))
+        except ValidationError as e:
+            report.add_error(line, [
+                f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+            ])
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -7,6 +7,19 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 10  # Connections kept open per engine and process
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load and closed when returned
+    DB_POOL_TIMEOUT: float = 30  # Seconds a request waits for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Reconnect connections older than this many seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True  # Test each connection on checkout (one extra round trip)
+    DB_CONNECTION_BUDGET: Optional[int] = None  # Connections all API processes may hold together; overrides the sizes above
+    DB_POOL_PROCESSES: int = 1  # Processes sharing DB_CONNECTION_BUDGET, i.e. workers per node x nodes
+    DB_POOLER: str = "auto"  # auto, pgbouncer or none; behind PgBouncer the app keeps no pool of its own
+    READ_REPLICA_URL: Optional[str] = None  # Streaming replica serving GET endpoints; unset sends every read to the primary
+    REPLICA_MAX_LAG_SECONDS: float = 2  # Reads go to the primary while the replica is further behind than this
+    REPLICA_LAG_CHECK_SECONDS: float = 1  # How often the replica lag is measured
+    READ_YOUR_WRITES_SECONDS: float = 5  # Clients that wrote this recently read from the primary; keep above max lag + check interval
     
     # Application
     APP_NAME: str = "Take a Photo API"
@@ -22,6 +35,72 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12  # Existing hashes with a different cost are rehashed at next login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads dedicated to bcrypt, separate from the request threadpool
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Hash/verify jobs queued beyond this are rejected with 503
+    LOGIN_RATE_PER_USERNAME: float = 5  # Login attempts per minute for one username
+    LOGIN_BURST_PER_USERNAME: int = 5
+    LOGIN_RATE_PER_IP: float = 30  # Login attempts per minute from one client address
+    LOGIN_BURST_PER_IP: int = 20
+    LOGIN_RATE_MAX_KEYS: int = 100000  # Buckets kept per limiter before idle ones are evicted
+    LAST_LOGIN_FLUSH_SECONDS: float = 5  # Max delay before a login timestamp is written
+    LAST_LOGIN_FLUSH_THRESHOLD: int = 500  # Buffered logins that trigger an early flush
+    SESSION_REGISTRY_REFRESH_SECONDS: float = 5  # How quickly revocations by other workers take effect
+    SESSION_REGISTRY_FULL_RELOAD_SECONDS: float = 600  # Full reloads also drop deleted users
+    USER_CACHE_TTL_SECONDS: int = 60  # How long other workers may serve a stale user after a change
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Invoice counts
+    INVOICE_COUNT_EXACT_THRESHOLD: int = 20000  # Filters the planner expects to match fewer rows are counted exactly
+    
+    # Invoice metadata
+    META_PROMOTED_KEYS: dict[str, str] = {}  # extra_metadata key -> generated column added by scripts/promote_meta_key.py
+    
+    # Reporting
+    REPORTING_TIMEZONE: str = "UTC"  # Zone whose calendar days the daily stats use, e.g. Asia/Ho_Chi_Minh
+    ROLLUP_OVERLAP_SECONDS: int = 300  # Re-read changes this far behind the watermark, for transactions that commit late
+    REPORT_MAX_DAYS: int = 366  # Longest date range a report may request
+    
+    # Partitioning (invoices and invoice_images by month of captured_at)
+    PARTITION_PREMAKE_MONTHS: int = 3  # Future months scripts/manage_partitions.py keeps created
+    INVOICE_RETENTION_MONTHS: Optional[int] = None  # Whole months older than this are expired; None keeps everything
+    PARTITION_EXPIRE_ACTION: str = "detach"  # detach keeps expired months as plain tables for archiving; drop deletes them and their images
+    PARTITION_LOCK_TIMEOUT_MS: int = 5000  # Partition DDL gives up instead of waiting longer for the parent lock
+    
+    # Uploads
+    UPLOAD_DIR: str = "uploads"  # Root of the local storage backend
+    UPLOAD_TEMP_DIR: str = "uploads"  # Staging for in-flight and resumable uploads; share it between API nodes
+    MAX_UPLOAD_SIZE: int = 20 * 1024 * 1024  # Max bytes per uploaded file
+    MAX_UPLOAD_FILES: int = 10  # Max images attached in a single invoice request
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes copied per chunk when streaming to disk
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Resumable uploads idle longer than this are expired
+    BLOB_GC_GRACE_SECONDS: int = 3600  # Unreferenced blobs used this recently are kept; must exceed the longest upload request
+    
+    # Image normalization at ingest
+    IMAGE_NORMALIZE_ENABLED: bool = False
+    IMAGE_MAX_DIMENSION: int = 2560  # Longest edge in pixels after downscaling
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_PROCESS_WORKERS: int = 2  # Size of the process pool doing the re-encoding
+    EXIF_DEFAULT_TIMEZONE: str = "UTC"  # Zone for EXIF capture times that carry no offset, e.g. Asia/Ho_Chi_Minh
+    
+    # Storage
+    STORAGE_BACKEND: str = "local"  # local or s3
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    S3_BUCKET: str = "take-a-photo"
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024  # Files larger than this use multipart upload
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024
+    S3_PRESIGNED_URL_TTL: int = 300  # Seconds a download redirect stays valid
+    
+    # Bulk import
+    BULK_IMPORT_BATCH_SIZE: int = 5000  # Rows validated and copied to the staging table at a time
+    BULK_IMPORT_MAX_ERRORS: int = 1000  # Row errors listed in an import report; the total is always counted
+    
+    # Downloads
+    ACCEL_REDIRECT_PREFIX: Optional[str] = None  # e.g. /protected-uploads/ mapped to UPLOAD_DIR by an internal nginx location
     
     class Config:
         env_file = ".env"
@@ -1,18 +1,46 @@
-from sqlalchemy import create_engine
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_pool import engine_options, instrument_engine
 
-# Create database engine with connection pooling
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=10,
-    max_overflow=20
-)
+
+def async_database_url(url: str) -> str:
+    """The same database addressed through the asyncpg driver"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Create database engine with connection pooling (sized by the DB_POOL_* settings)
+# The sync engine serves Alembic, scripts and other code outside the event loop
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, "db_sync", is_async=False))
+instrument_engine(engine, "db_sync")
+
+# Async engine used by the API; queries run on the event loop instead of the threadpool
+_async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, "db", is_async=True))
+instrument_engine(async_engine.sync_engine, "db")
+
+# Optional streaming replica for reads; see app.core.replica for routing
+replica_engine = None
+if settings.READ_REPLICA_URL:
+    _replica_url = async_database_url(settings.READ_REPLICA_URL)
+    replica_engine = create_async_engine(_replica_url, **engine_options(_replica_url, "db_replica", is_async=True))
+    instrument_engine(replica_engine.sync_engine, "db_replica")
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps RETURNING-populated objects usable after commit without a refresh
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async sessions cannot lazy load, so relationships must be loaded explicitly
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False) if replica_engine is not None else None
+)
 
 # Create Base class for models
 Base = declarative_base()
@@ -20,9 +48,19 @@ Base = declarative_base()
 
 # Dependency for database sessions
 def get_db():
-    """Database session dependency for FastAPI routes"""
+    """Synchronous database session dependency"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    """Database session dependency for FastAPI routes; commits are noted for read-your-writes"""
+    async with AsyncSessionLocal() as db:
+        def after_commit(session):
+            request.state.wrote_at = time.time()
+
+        event.listen(db.sync_session, "after_commit", after_commit)
+        yield db
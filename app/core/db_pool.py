@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+import uuid
+from typing import Any, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; waits past the last one mean the pool is too small
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LIFETIME_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 24 * 3600)
+
+PGBOUNCER_PORT = 6432
+
+
+class PoolConfig(NamedTuple):
+    """Resolved pool settings for one engine"""
+    pgbouncer: bool
+    pool_size: int
+    max_overflow: int
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            # logging_name survives pool.recreate() on dispose, unlike other attributes
+            name = getattr(self, "logging_name", None) or "db"
+            metrics.histogram(f"{name}_pool_checkout_wait_seconds", CHECKOUT_WAIT_BUCKETS).observe(
+                time.monotonic() - started
+            )
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def uses_pgbouncer(url: str) -> bool:
+    """Whether DATABASE_URL points at PgBouncer, per DB_POOLER or its default port and host name"""
+    mode = settings.DB_POOLER.lower()
+    if mode != "auto":
+        return mode == "pgbouncer"
+    parsed = make_url(url)
+    return parsed.port == PGBOUNCER_PORT or "pgbouncer" in (parsed.host or "")
+
+
+def pool_config(url: str) -> PoolConfig:
+    """
+    Pool sizes for this process
+    With DB_CONNECTION_BUDGET the budget is split evenly over DB_POOL_PROCESSES with no
+    overflow, so scaling out can never exceed it; behind PgBouncer no pool is kept at all
+    """
+    if uses_pgbouncer(url):
+        return PoolConfig(pgbouncer=True, pool_size=0, max_overflow=0)
+    if settings.DB_CONNECTION_BUDGET is not None:
+        per_process = settings.DB_CONNECTION_BUDGET // max(1, settings.DB_POOL_PROCESSES)
+        if per_process < 1:
+            logger.warning(
+                "DB_CONNECTION_BUDGET=%s is smaller than DB_POOL_PROCESSES=%s; using one connection per process",
+                settings.DB_CONNECTION_BUDGET, settings.DB_POOL_PROCESSES
+            )
+        return PoolConfig(pgbouncer=False, pool_size=max(1, per_process), max_overflow=0)
+    return PoolConfig(pgbouncer=False, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+
+
+def engine_options(url: str, name: str, is_async: bool) -> dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine"""
+    config = pool_config(url)
+    logger.info(
+        "Database engine %s: %s",
+        name,
+        "PgBouncer, no local pool" if config.pgbouncer
+        else f"pool_size={config.pool_size} max_overflow={config.max_overflow}"
+    )
+    options: dict[str, Any] = {"pool_logging_name": name}
+    if config.pgbouncer:
+        # PgBouncer already pools; a second pool here would pin its server connections
+        options["poolclass"] = TimedNullPool
+        if is_async:
+            # Transaction pooling cannot keep prepared statements between transactions
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Export pool activity for engine under the name prefix: connections in use and opened,
+    overflow in use, pre-ping failures and connection lifetime
+    Pass async_engine.sync_engine for an async engine
+    """
+    in_use = 0
+    lock = threading.Lock()
+    opened = metrics.counter(f"{name}_pool_connections_opened")
+    pre_ping_failures = metrics.counter(f"{name}_pool_pre_ping_failures")
+    lifetime = metrics.histogram(f"{name}_pool_connection_lifetime_seconds", LIFETIME_BUCKETS)
+
+    def overflow() -> int:
+        pool = engine.pool
+        return max(0, pool.overflow()) if isinstance(pool, QueuePool) else 0
+
+    def size() -> int:
+        pool = engine.pool
+        return pool.size() if isinstance(pool, QueuePool) else 0
+
+    metrics.register_gauge(f"{name}_pool_in_use", lambda: in_use)
+    metrics.register_gauge(f"{name}_pool_overflow", overflow)
+    metrics.register_gauge(f"{name}_pool_size", size)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        opened.inc()
+        connection_record.info["connected_at"] = time.monotonic()
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        connected_at = connection_record.info.pop("connected_at", None)
+        if connected_at is not None:
+            lifetime.observe(time.monotonic() - connected_at)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        nonlocal in_use
+        with lock:
+            in_use += 1
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        nonlocal in_use
+        with lock:
+            in_use -= 1
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        if context.is_pre_ping:
+            pre_ping_failures.inc()
@@ -1,25 +1,36 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.core.security import verify_token
-from app.models.user import User
+from app.core.user_cache import AuthUser, user_cache
 from app.crud import user as user_crud
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+async def _load_auth_user(user_id: uuid.UUID) -> Optional[AuthUser]:
+    """Read the auth fields of a user on a short-lived session and cache them"""
+    async with AsyncSessionLocal() as db:
+        user = await user_crud.get_user(db, user_id=user_id)
+        if user is None:
+            return None
+        auth_user = AuthUser.from_user(user)
+    user_cache.set(auth_user)
+    return auth_user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> AuthUser:
     """
     Dependency to get current authenticated user from JWT token
     Use this in routes that require authentication
+    The user is served from the in-process cache when possible, so this does not
+    hold a pooled DB connection; load the full User in the route if it is needed
     """
     token = credentials.credentials
     
@@ -50,8 +61,10 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = user_crud.get_user(db, user_id=user_id)
+    # Get user from cache, falling back to the database
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await _load_auth_user(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,6 +72,14 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Tokens issued before the column existed carry no version and count as version 1
+    if payload.get("sv", 1) != user.session_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     # Check if user is active
     if not user.is_active:
         raise HTTPException(
@@ -70,10 +91,25 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthUser = Depends(get_current_user)
+) -> AuthUser:
     """
     Dependency to get current active user
     Alias for get_current_user with explicit active check
     """
     return current_user
+
+
+def get_current_admin_user(
+    current_user: AuthUser = Depends(get_current_user)
+) -> AuthUser:
+    """
+    Dependency for admin-only routes
+    Raises 403 for staff users
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
@@ -0,0 +1,88 @@
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+# Long-lived caching is safe because stored image bytes never change
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+SEND_CHUNK_SIZE = 256 * 1024
+
+
+def parse_range(range_header: Optional[str], file_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range into an inclusive (start, end) pair
+    Returns None when the whole file should be sent (no header, multiple ranges or a
+    non-byte unit) and raises ValueError when the range cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    start_text, _, end_text = spec.partition("-")
+    if start_text == "":
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("Unsatisfiable range")
+        return max(file_size - length, 0), file_size - 1
+
+    start = int(start_text)
+    end = int(end_text) if end_text else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, file_size - 1)
+
+
+class RangeFileResponse(Response):
+    """
+    Send a byte range of a local file
+    Uses the ASGI zero-copy send extension when the server offers it, otherwise reads
+    bounded chunks on a worker thread
+    """
+
+    def __init__(self, path: str, start: int, end: int, file_size: int, headers: dict, media_type: Optional[str] = None):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{file_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        count = self.end - self.start + 1
+        fd = await run_in_threadpool(open, self.path, "rb")
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                return
+
+            await run_in_threadpool(fd.seek, self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await run_in_threadpool(fd.read, min(SEND_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await run_in_threadpool(fd.close)
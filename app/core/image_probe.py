@@ -0,0 +1,226 @@
+import struct
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import NamedTuple, Optional
+
+# Enough to cover the JPEG APP segments (EXIF is capped at 64 KB) that precede the frame header
+PROBE_HEAD_SIZE = 256 * 1024
+
+# EXIF tags
+TAG_ORIENTATION = 0x0112
+TAG_EXIF_IFD = 0x8769
+TAG_GPS_IFD = 0x8825
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_OFFSET_TIME_ORIGINAL = 0x9011
+TAG_GPS_LATITUDE_REF = 0x0001
+TAG_GPS_LATITUDE = 0x0002
+TAG_GPS_LONGITUDE_REF = 0x0003
+TAG_GPS_LONGITUDE = 0x0004
+
+# (positive ref, negative ref, largest magnitude in degrees)
+GPS_LATITUDE = ("N", "S", 90)
+GPS_LONGITUDE = ("E", "W", 180)
+
+# TIFF field type -> size in bytes
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+# JPEG start-of-frame markers carrying the image dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class UnsupportedImageError(ValueError):
+    """Raised when the uploaded bytes are not an image format we accept"""
+
+
+class ImageProbe(NamedTuple):
+    """Metadata read from an image header without decoding pixels"""
+    mime_type: str
+    width: Optional[int] = None  # As displayed, after EXIF orientation
+    height: Optional[int] = None
+    gps_latitude: Optional[float] = None
+    gps_longitude: Optional[float] = None
+    taken_at: Optional[datetime] = None
+
+
+def _read_ifd(data: bytes, offset: int, endian: str) -> dict:
+    """Read one TIFF IFD into {tag: (type, count, value_offset)}"""
+    entries = {}
+    if offset + 2 > len(data):
+        return entries
+    (count,) = struct.unpack_from(endian + "H", data, offset)
+    for index in range(count):
+        entry = offset + 2 + index * 12
+        if entry + 12 > len(data):
+            break
+        tag, field_type, value_count = struct.unpack_from(endian + "HHI", data, entry)
+        size = TIFF_TYPE_SIZES.get(field_type, 1) * value_count
+        value_offset = entry + 8 if size <= 4 else struct.unpack_from(endian + "I", data, entry + 8)[0]
+        entries[tag] = (field_type, value_count, value_offset)
+    return entries
+
+
+def _ifd_value(data: bytes, entries: dict, tag: int, endian: str):
+    """Decode the value of an IFD entry; rationals become floats, ASCII becomes str"""
+    if tag not in entries:
+        return None
+    field_type, count, offset = entries[tag]
+    size = TIFF_TYPE_SIZES.get(field_type, 1) * count
+    if offset + size > len(data):
+        return None
+    if field_type == 2:
+        return data[offset:offset + count].split(b"\0", 1)[0].decode("ascii", "replace")
+    if field_type == 3:
+        values = struct.unpack_from(endian + "H" * count, data, offset)
+    elif field_type in (4, 9):
+        values = struct.unpack_from(endian + ("I" if field_type == 4 else "i") * count, data, offset)
+    elif field_type in (5, 10):
+        raw = struct.unpack_from(endian + ("I" if field_type == 5 else "i") * 2 * count, data, offset)
+        values = tuple(raw[i] / raw[i + 1] if raw[i + 1] else 0.0 for i in range(0, len(raw), 2))
+    else:
+        return None
+    return values[0] if count == 1 else values
+
+
+def _gps_coordinate(value, ref: Optional[str], axis: tuple) -> Optional[float]:
+    """
+    Convert degrees/minutes/seconds to signed decimal degrees
+    Returns None for a missing or unknown ref and for values outside the axis range
+    """
+    positive, negative, limit = axis
+    if not isinstance(value, tuple) or len(value) != 3:
+        return None
+    ref = ref.strip().upper() if isinstance(ref, str) else None
+    if ref not in (positive, negative):
+        return None
+    degrees = value[0] + value[1] / 60 + value[2] / 3600
+    if not 0 <= degrees <= limit:
+        return None
+    if ref == negative:
+        degrees = -degrees
+    return round(degrees, 6)
+
+
+def _parse_offset(text: Optional[str]) -> Optional[tzinfo]:
+    """Parse an EXIF OffsetTime such as +07:00; None if malformed or out of range"""
+    if not text or len(text) < 6 or text[0] not in "+-":
+        return None
+    if not (text[1:3].isdigit() and text[4:6].isdigit()):
+        return None
+    hours, minutes = int(text[1:3]), int(text[4:6])
+    # timezone() rejects offsets of a day or more
+    if hours >= 24 or minutes >= 60:
+        return None
+    delta = timedelta(hours=hours, minutes=minutes)
+    return timezone(-delta if text[0] == "-" else delta)
+
+
+def _parse_exif(tiff: bytes, default_tz: tzinfo) -> dict:
+    """Extract orientation, GPS and capture time from a TIFF/EXIF block"""
+    if len(tiff) < 8 or tiff[:2] not in (b"II", b"MM"):
+        return {}
+    endian = "<" if tiff[:2] == b"II" else ">"
+    (ifd0_offset,) = struct.unpack_from(endian + "I", tiff, 4)
+    ifd0 = _read_ifd(tiff, ifd0_offset, endian)
+    result = {"orientation": _ifd_value(tiff, ifd0, TAG_ORIENTATION, endian) or 1}
+
+    exif_offset = _ifd_value(tiff, ifd0, TAG_EXIF_IFD, endian)
+    if isinstance(exif_offset, int):
+        exif_ifd = _read_ifd(tiff, exif_offset, endian)
+        taken = _ifd_value(tiff, exif_ifd, TAG_DATETIME_ORIGINAL, endian)
+        if isinstance(taken, str):
+            try:
+                taken_at = datetime.strptime(taken.strip(), "%Y:%m:%d %H:%M:%S")
+            except ValueError:
+                taken_at = None
+            if taken_at is not None:
+                offset = _parse_offset(_ifd_value(tiff, exif_ifd, TAG_OFFSET_TIME_ORIGINAL, endian))
+                result["taken_at"] = taken_at.replace(tzinfo=offset or default_tz)
+
+    gps_offset = _ifd_value(tiff, ifd0, TAG_GPS_IFD, endian)
+    if isinstance(gps_offset, int):
+        gps_ifd = _read_ifd(tiff, gps_offset, endian)
+        result["gps_latitude"] = _gps_coordinate(
+            _ifd_value(tiff, gps_ifd, TAG_GPS_LATITUDE, endian),
+            _ifd_value(tiff, gps_ifd, TAG_GPS_LATITUDE_REF, endian),
+            GPS_LATITUDE
+        )
+        result["gps_longitude"] = _gps_coordinate(
+            _ifd_value(tiff, gps_ifd, TAG_GPS_LONGITUDE, endian),
+            _ifd_value(tiff, gps_ifd, TAG_GPS_LONGITUDE_REF, endian),
+            GPS_LONGITUDE
+        )
+    return result
+
+
+def _probe_jpeg(head: bytes, default_tz: tzinfo) -> ImageProbe:
+    """Walk JPEG marker segments up to the frame header"""
+    exif = {}
+    width = height = None
+    position = 2
+    while position + 4 <= len(head):
+        if head[position] != 0xFF:
+            break
+        marker = head[position + 1]
+        if marker == 0xFF:
+            # Fill byte
+            position += 1
+            continue
+        if marker in (0x01,) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        (length,) = struct.unpack_from(">H", head, position + 2)
+        segment = head[position + 4:position + 2 + length]
+        if marker == 0xE1 and segment.startswith(b"Exif\0\0") and not exif:
+            exif = _parse_exif(segment[6:], default_tz)
+        elif marker in JPEG_SOF_MARKERS and len(segment) >= 5:
+            height, width = struct.unpack_from(">HH", segment, 1)
+            break
+        elif marker == 0xDA:
+            # Start of scan: no more headers
+            break
+        position += 2 + length
+
+    if exif.get("orientation", 1) >= 5 and width is not None:
+        width, height = height, width
+    return ImageProbe(
+        mime_type="image/jpeg",
+        width=width,
+        height=height,
+        gps_latitude=exif.get("gps_latitude"),
+        gps_longitude=exif.get("gps_longitude"),
+        taken_at=exif.get("taken_at")
+    )
+
+
+def _probe_webp(head: bytes) -> ImageProbe:
+    """Read canvas size from the first WebP chunk"""
+    chunk = head[12:16]
+    width = height = None
+    if chunk == b"VP8X" and len(head) >= 30:
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+    elif chunk == b"VP8L" and len(head) >= 25:
+        bits = int.from_bytes(head[21:25], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b"VP8 " and len(head) >= 30:
+        width = int.from_bytes(head[26:28], "little") & 0x3FFF
+        height = int.from_bytes(head[28:30], "little") & 0x3FFF
+    return ImageProbe(mime_type="image/webp", width=width, height=height)
+
+
+def probe_image(head: bytes, default_tz: tzinfo = timezone.utc) -> ImageProbe:
+    """
+    Identify an image by its magic bytes and read dimensions, EXIF GPS and capture time
+    head should hold the first PROBE_HEAD_SIZE bytes of the file (or all of it if shorter)
+    Capture times without an EXIF offset are interpreted in default_tz
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return _probe_jpeg(head, default_tz)
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        width, height = struct.unpack_from(">II", head, 16)
+        return ImageProbe(mime_type="image/png", width=width, height=height)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _probe_webp(head)
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1", b"hevc"):
+        return ImageProbe(mime_type="image/heic")
+    raise UnsupportedImageError("File is not a supported image (JPEG, PNG, WebP or HEIC)")
@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def normalize_image(src_path: str, dst_path: str, max_dimension: int, jpeg_quality: int) -> Optional[int]:
+    """
+    Auto-rotate, downscale and re-encode a JPEG or PNG without non-essential metadata
+    Writes the result to dst_path and returns its size, or None when the original should be kept
+    Runs in a worker process
+    """
+    from PIL import Image, ImageOps
+
+    original_size = os.path.getsize(src_path)
+    try:
+        with Image.open(src_path) as image:
+            image_format = image.format
+            if image_format not in ("JPEG", "PNG"):
+                return None
+
+            orientation = image.getexif().get(0x0112, 1)  # EXIF Orientation
+            normalized = ImageOps.exif_transpose(image)
+            if max(normalized.size) > max_dimension:
+                normalized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            needs_rewrite = orientation != 1 or normalized.size != image.size
+
+            # EXIF, XMP and text chunks are dropped by not passing them on; the ICC profile
+            # is kept because colours render wrongly without it
+            save_options = {"optimize": True}
+            icc_profile = image.info.get("icc_profile")
+            if icc_profile:
+                save_options["icc_profile"] = icc_profile
+            if image_format == "JPEG":
+                if normalized.mode not in ("RGB", "L"):
+                    normalized = normalized.convert("RGB")
+                save_options.update(quality=jpeg_quality, progressive=True)
+            normalized.save(dst_path, format=image_format, **save_options)
+    except (OSError, Image.DecompressionBombError):
+        # Unreadable or suspicious images are stored as received
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        return None
+
+    # Keep the original when re-encoding an untouched image did not make it smaller
+    output_size = os.path.getsize(dst_path)
+    if not needs_rewrite and output_size >= original_size:
+        os.remove(dst_path)
+        return None
+    return output_size
+
+
+def get_image_executor() -> ProcessPoolExecutor:
+    """Return the process pool used for image work, creating it on first use"""
+    global _executor
+    if _executor is None:
+        # spawn avoids forking a process that already runs threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_image_executor() -> None:
+    """Stop the image worker processes"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def normalize_file(src_path: str, dst_path: str) -> Optional[int]:
+    """Normalize an image in the process pool from synchronous code (blocks the calling thread)"""
+    future = get_image_executor().submit(
+        normalize_image, src_path, dst_path, settings.IMAGE_MAX_DIMENSION, settings.IMAGE_JPEG_QUALITY
+    )
+    return future.result()
+
+
+async def normalize_file_async(src_path: str, dst_path: str) -> Optional[int]:
+    """Normalize an image in the process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_image_executor(),
+        normalize_image, src_path, dst_path, settings.IMAGE_MAX_DIMENSION, settings.IMAGE_JPEG_QUALITY
+    )
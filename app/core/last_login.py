@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import user as user_crud
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer of login timestamps, flushed as one bulk UPDATE
+    Timestamps may lag by up to LAST_LOGIN_FLUSH_SECONDS; entries still buffered
+    when the process is killed without a clean shutdown are lost
+    """
+
+    def __init__(self, flush_threshold: int):
+        self.flush_threshold = flush_threshold
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.flushed = metrics.counter("last_login_flushed")
+        self.flush_errors = metrics.counter("last_login_flush_errors")
+        metrics.register_gauge("last_login_pending", lambda: len(self._pending))
+
+    def record(self, user_id: uuid.UUID, at: Optional[datetime] = None) -> None:
+        """Buffer a login; wakes the flusher once the threshold is reached"""
+        at = at or datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[user_id] = max(at, self._pending.get(user_id, at))
+            full = len(self._pending) >= self.flush_threshold
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write buffered timestamps to the database and return how many were written"""
+        with self._lock:
+            logins, self._pending = self._pending, {}
+        if not logins:
+            return 0
+        try:
+            async with AsyncSessionLocal() as db:
+                await user_crud.bulk_update_last_login(db, logins)
+        except Exception:
+            # Put the batch back so the next flush retries it
+            self.flush_errors.inc()
+            with self._lock:
+                for user_id, at in logins.items():
+                    self._pending[user_id] = max(at, self._pending.get(user_id, at))
+            raise
+        self.flushed.inc(len(logins))
+        return len(logins)
+
+    async def run(self, interval: float) -> None:
+        """Flush every interval seconds, or sooner when the buffer fills up"""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing last login timestamps failed")
+
+
+last_login_buffer = LastLoginBuffer(settings.LAST_LOGIN_FLUSH_THRESHOLD)
+
+
+def start_last_login_flusher() -> asyncio.Task:
+    """Start the periodic flush on the running event loop"""
+    return asyncio.create_task(last_login_buffer.run(settings.LAST_LOGIN_FLUSH_SECONDS))
+
+
+async def stop_last_login_flusher(task: asyncio.Task) -> None:
+    """Stop the periodic flush and write out whatever is still buffered"""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await last_login_buffer.flush()
@@ -0,0 +1,105 @@
+import bisect
+import threading
+from typing import Callable, Dict, Sequence
+
+# In-process metrics, exposed as JSON on /metrics; values are per worker process
+
+
+class Counter:
+    """A monotonically increasing count"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Summary:
+    """Count, sum and maximum of observed values, e.g. wait times in seconds"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+
+class Histogram:
+    """Observed values counted into buckets by upper bound, plus their count and sum"""
+
+    def __init__(self, name: str, buckets: Sequence[float]):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+
+_counters: Dict[str, Counter] = {}
+_summaries: Dict[str, Summary] = {}
+_histograms: Dict[str, Histogram] = {}
+_gauges: Dict[str, Callable[[], float]] = {}
+
+
+def counter(name: str) -> Counter:
+    """Return the counter registered under name, creating it on first use"""
+    if name not in _counters:
+        _counters[name] = Counter(name)
+    return _counters[name]
+
+
+def summary(name: str) -> Summary:
+    """Return the summary registered under name, creating it on first use"""
+    if name not in _summaries:
+        _summaries[name] = Summary(name)
+    return _summaries[name]
+
+
+def histogram(name: str, buckets: Sequence[float]) -> Histogram:
+    """Return the histogram registered under name, creating it with buckets on first use"""
+    if name not in _histograms:
+        _histograms[name] = Histogram(name, buckets)
+    return _histograms[name]
+
+
+def register_gauge(name: str, read: Callable[[], float]) -> None:
+    """Report the current value of read() under name"""
+    _gauges[name] = read
+
+
+def snapshot() -> dict:
+    """Current value of every registered metric"""
+    values = {name: metric.value for name, metric in _counters.items()}
+    for name, metric in _summaries.items():
+        values[f"{name}_count"] = metric.count
+        values[f"{name}_sum"] = metric.sum
+        values[f"{name}_max"] = metric.max
+    for name, metric in _histograms.items():
+        # Cumulative counts, as in Prometheus le buckets
+        total = 0
+        for bound, count in zip(metric.buckets + (float("inf"),), metric.counts):
+            total += count
+            values[f"{name}_le_{bound:g}"] = total
+        values[f"{name}_count"] = metric.count
+        values[f"{name}_sum"] = metric.sum
+    values.update({name: read() for name, read in _gauges.items()})
+    return dict(sorted(values.items()))
@@ -0,0 +1,20 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(captured_at: datetime, row_id: uuid.UUID) -> str:
+    """Opaque cursor pointing just after the (captured_at, id) of the last row returned"""
+    raw = json.dumps([captured_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        captured_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(captured_at), uuid.UUID(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from passlib.context import CryptContext
+
+from app.core import metrics
+from app.core.config import settings
+
+# Hashes whose cost differs from BCRYPT_ROUNDS report needs_update and are replaced on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+_lock = threading.Lock()
+
+_wait_time = metrics.summary("password_hash_wait_seconds")
+_run_time = metrics.summary("password_hash_run_seconds")
+_rejected = metrics.counter("password_hash_rejected")
+metrics.register_gauge("password_hash_queue_depth", lambda: _pending)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many hash or verify jobs are already waiting"""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the bcrypt thread pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+
+def shutdown_password_executor() -> None:
+    """Stop the bcrypt threads"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _release(future: Future) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _submit(fn: Callable, *args) -> Future:
+    """
+    Queue fn on the bcrypt pool, refusing work past PASSWORD_HASH_MAX_PENDING
+    bcrypt releases the GIL, so the pool size bounds the CPU spent on it
+    """
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            _rejected.inc()
+            raise PasswordHasherBusyError("Too many password operations in progress")
+        _pending += 1
+    submitted = time.monotonic()
+
+    def run():
+        started = time.monotonic()
+        _wait_time.observe(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            _run_time.observe(time.monotonic() - started)
+
+    try:
+        future = _get_executor().submit(run)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bcrypt pool without blocking the event loop"""
+    return await asyncio.wrap_future(_submit(pwd_context.hash, password))
+
+
+async def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bcrypt pool without blocking the event loop
+    Returns (valid, new_hash); new_hash is set when the stored hash should be replaced
+    """
+    return await asyncio.wrap_future(_submit(pwd_context.verify_and_update, password, password_hash))
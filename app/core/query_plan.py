@@ -0,0 +1,31 @@
+import json
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.expression import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) of a statement, executed like any other statement
+    Parameters stay bound, so values without a literal renderer (e.g. JSONB) can be explained
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    sql = compiler.process(element.statement, **kw)
+    # The result is the plan, not the explained statement's columns
+    compiler._result_columns = []
+    return f"EXPLAIN (FORMAT JSON) {sql}"
+
+
+def root_plan(result) -> dict:
+    """Root plan node of an EXPLAIN (FORMAT JSON) result, decoded if the driver returns text"""
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
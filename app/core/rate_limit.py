@@ -0,0 +1,46 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core import metrics
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets holding up to capacity tokens, refilled at rate tokens per second
+    At most max_keys buckets are kept; the least recently used one is dropped first,
+    which at worst lets that key start again with a full bucket
+    """
+
+    def __init__(self, name: str, capacity: float, rate: float, max_keys: int):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = metrics.counter(f"{name}_allowed")
+        self.throttled = metrics.counter(f"{name}_throttled")
+        self.evictions = metrics.counter(f"{name}_evictions")
+        metrics.register_gauge(f"{name}_buckets", lambda: len(self._buckets))
+
+    def acquire(self, key: str) -> float:
+        """Take one token for key; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions.inc()
+
+        if wait:
+            self.throttled.inc()
+        else:
+            self.allowed.inc()
+        return wait
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from starlette.datastructures import MutableHeaders
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Returned after a request commits; clients echo it (browsers via the cookie) on later reads
+WRITE_TOKEN_HEADER = "X-Write-Token"
+WRITE_TOKEN_COOKIE = "write_token"
+
+# Seconds the replica is behind; zero when it has replayed everything it received
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaMonitor:
+    """
+    Periodically measured replication lag of the read replica
+    The replica is only used while the last check is recent and within REPLICA_MAX_LAG_SECONDS
+    """
+
+    def __init__(self):
+        self.lag: Optional[float] = None
+        self._checked_at = 0.0
+        self.replica_reads = metrics.counter("replica_reads")
+        self.primary_reads_lag = metrics.counter("replica_fallback_lag")
+        self.primary_reads_write = metrics.counter("replica_fallback_recent_write")
+        metrics.register_gauge("replica_lag_seconds", lambda: -1 if self.lag is None else self.lag)
+
+    async def check(self) -> None:
+        """Measure the lag on the replica"""
+        async with replica_engine.connect() as conn:
+            self.lag = float((await conn.execute(LAG_SQL)).scalar())
+        self._checked_at = time.monotonic()
+
+    def healthy(self) -> bool:
+        """Whether the replica answered recently and is close enough to the primary"""
+        if self.lag is None:
+            return False
+        stale = time.monotonic() - self._checked_at > 3 * settings.REPLICA_LAG_CHECK_SECONDS
+        return not stale and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    async def run(self, interval: float) -> None:
+        """Check every interval seconds"""
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                self.lag = None
+                logger.warning("Checking read replica lag failed", exc_info=True)
+            await asyncio.sleep(interval)
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def _wrote_recently(request: Request) -> bool:
+    """Whether the client sent a write token younger than READ_YOUR_WRITES_SECONDS"""
+    token = request.headers.get(WRITE_TOKEN_HEADER) or request.cookies.get(WRITE_TOKEN_COOKIE)
+    if not token:
+        return False
+    try:
+        wrote_at = float(token)
+    except ValueError:
+        return False
+    return time.time() - wrote_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+def use_replica(request: Request) -> bool:
+    """Route a read to the replica unless it lags or the client has just written"""
+    if ReplicaSessionLocal is None:
+        return False
+    if _wrote_recently(request):
+        replica_monitor.primary_reads_write.inc()
+        return False
+    if not replica_monitor.healthy():
+        replica_monitor.primary_reads_lag.inc()
+        return False
+    replica_monitor.replica_reads.inc()
+    return True
+
+
+async def get_read_db(request: Request):
+    """Session dependency for read-only routes: the replica when safe, else the primary"""
+    session_factory = ReplicaSessionLocal if use_replica(request) else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+class WriteTokenMiddleware:
+    """Hand out a write token on responses to requests that committed on the primary"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start":
+                wrote_at = scope.get("state", {}).get("wrote_at")
+                if wrote_at is not None:
+                    token = f"{wrote_at:.3f}"
+                    headers = MutableHeaders(scope=message)
+                    headers[WRITE_TOKEN_HEADER] = token
+                    headers.append(
+                        "Set-Cookie",
+                        f"{WRITE_TOKEN_COOKIE}={token}; Max-Age={int(settings.READ_YOUR_WRITES_SECONDS) + 1}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
+
+
+def start_replica_monitor() -> Optional[asyncio.Task]:
+    """Start measuring replica lag on the running event loop, if a replica is configured"""
+    if replica_engine is None:
+        return None
+    return asyncio.create_task(replica_monitor.run(settings.REPLICA_LAG_CHECK_SECONDS))
+
+
+async def stop_replica_monitor(task: Optional[asyncio.Task]) -> None:
+    """Stop the lag checks"""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -43,11 +43,12 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         return None
 
 
-def create_tokens(user_id: uuid.UUID, username: str) -> dict:
+def create_tokens(user_id: uuid.UUID, username: str, session_version: int = 1) -> dict:
     """Create both access and refresh tokens"""
     token_data = {
         "sub": str(user_id),
-        "username": username
+        "username": username,
+        "sv": session_version  # Tokens stop working once the user's session_version moves on
     }
     
     access_token = create_access_token(token_data)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.user_cache import on_user_changed, user_cache
+from app.crud import user as user_crud
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows changed slightly before the last one seen, so updates committed
+# by long transactions (whose updated_at is their start time) are not missed
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class SessionState(NamedTuple):
+    """What a token must agree with to still be valid"""
+    username: str
+    session_version: int
+    is_active: bool
+
+
+class SessionRegistry:
+    """
+    In-memory copy of every user's session version and active flag
+    Loaded in full at startup (and periodically, to notice deleted users), then kept
+    current by reading only rows changed since the last refresh
+    """
+
+    def __init__(self):
+        self._states: dict[uuid.UUID, SessionState] = {}
+        self._watermark: Optional[datetime] = None
+        self._last_full_load = 0.0
+        self._lock = threading.Lock()
+        self.fallbacks = metrics.counter("session_registry_fallbacks")
+        metrics.register_gauge("session_registry_size", lambda: len(self._states))
+
+    def get(self, user_id: uuid.UUID) -> Optional[SessionState]:
+        return self._states.get(user_id)
+
+    async def load_user(self, user_id: uuid.UUID) -> Optional[SessionState]:
+        """Read one user the registry does not know yet (e.g. created since the last refresh)"""
+        self.fallbacks.inc()
+        async with AsyncSessionLocal() as db:
+            user = await user_crud.get_user(db, user_id=user_id)
+            if user is None:
+                return None
+            state = SessionState(user.username, user.session_version, bool(user.is_active))
+        with self._lock:
+            self._states[user_id] = state
+        return state
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    async def refresh(self) -> None:
+        """Apply changes since the last refresh, or reload everything when due"""
+        previous = self._watermark
+        reload_due = time.monotonic() - self._last_full_load >= settings.SESSION_REGISTRY_FULL_RELOAD_SECONDS
+        full = previous is None or reload_due
+        async with AsyncSessionLocal() as db:
+            rows = await user_crud.get_session_states(db, changed_since=None if full else previous - REFRESH_OVERLAP)
+
+        states = {row.id: SessionState(row.username, row.session_version, bool(row.is_active)) for row in rows}
+        seen = [row.changed_at for row in rows if row.changed_at is not None]
+        with self._lock:
+            if full:
+                self._states = states
+                self._last_full_load = time.monotonic()
+            else:
+                self._states.update(states)
+            if seen:
+                self._watermark = max(seen + ([previous] if previous else []))
+
+        # Users changed by other workers must not be served stale from the user cache either
+        if previous is not None:
+            for row in rows:
+                if row.changed_at is not None and row.changed_at > previous:
+                    user_cache.invalidate(row.id)
+
+    async def run(self, interval: float) -> None:
+        """Refresh every interval seconds"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Refreshing the session registry failed")
+            await asyncio.sleep(interval)
+
+
+session_registry = SessionRegistry()
+on_user_changed(session_registry.invalidate)
+
+
+def start_session_registry() -> asyncio.Task:
+    """Start loading and refreshing the registry on the running event loop"""
+    return asyncio.create_task(session_registry.run(settings.SESSION_REGISTRY_REFRESH_SECONDS))
+
+
+async def stop_session_registry(task: asyncio.Task) -> None:
+    """Stop the periodic refresh"""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def get_session_state(user_id: uuid.UUID) -> Optional[SessionState]:
+    """Session state of a user, read from the database only if the registry lacks it"""
+    state = session_registry.get(user_id)
+    if state is None:
+        state = await session_registry.load_user(user_id)
+    return state
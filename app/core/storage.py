@@ -0,0 +1,169 @@
+import os
+import shutil
+from functools import lru_cache
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+
+
+class StorageBackend:
+    """Where image blobs live; keys are relative paths such as blobs/ab/cd/<sha256>"""
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put_file(self, source_path: str, key: str, content_type: Optional[str] = None, keep_source: bool = False) -> bool:
+        """
+        Store a local file under key and return True if this call created the object
+        The source file is consumed unless keep_source is set
+        """
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of the object when the backend is local, else None"""
+        return None
+
+    def presigned_url(self, key: str, expires_in: int) -> Optional[str]:
+        """Time-limited URL clients can download the object from directly, if supported"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Blobs stored on a local or network-mounted filesystem"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def put_file(self, source_path: str, key: str, content_type: Optional[str] = None, keep_source: bool = False) -> bool:
+        final_path = self.local_path(key)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+        # Make the content durable before it becomes visible under its final name
+        with open(source_path, "rb") as fd:
+            os.fsync(fd.fileno())
+
+        if keep_source:
+            try:
+                os.link(source_path, final_path)
+            except FileExistsError:
+                return False
+            except OSError:
+                # Staging and storage are on different filesystems
+                shutil.copyfile(source_path, final_path)
+        else:
+            os.replace(source_path, final_path)
+        return True
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Storage(StorageBackend):
+    """Blobs stored in an S3-compatible bucket (AWS S3, MinIO, moto)"""
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        max_pool_connections: int = 50,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024
+    ):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package") from e
+
+        self.bucket = bucket
+        # One client per process; botocore keeps a pool of keep-alive connections
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(max_pool_connections=max_pool_connections, retries={"mode": "standard"})
+        )
+        # Files above the threshold are sent as multipart uploads streamed from disk
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=4
+        )
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, source_path: str, key: str, content_type: Optional[str] = None, keep_source: bool = False) -> bool:
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_file(
+            source_path, self.bucket, key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config
+        )
+        if not keep_source:
+            os.remove(source_path)
+        return True
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_url(self, key: str, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in
+        )
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_SIZE
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
@@ -0,0 +1,383 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, List, NamedTuple, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.responses import JSONResponse
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.image_probe import PROBE_HEAD_SIZE, ImageProbe, probe_image
+from app.core.imaging import normalize_file, normalize_file_async
+from app.core.storage import get_storage
+from app.models.image_blob import ImageBlob
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File exceeds maximum upload size of {max_size} bytes")
+
+
+class StoredBlob(NamedTuple):
+    """A file placed in content-addressed storage"""
+    file_path: str  # Storage key, e.g. blobs/ab/cd/<sha256>
+    file_size: int
+    sha256: str
+    created: bool  # False when identical bytes were already stored
+    original_size: Optional[int] = None  # Bytes received, before ingest normalization
+    probe: Optional[ImageProbe] = None  # Header metadata of the received image
+
+    def image_fields(self) -> dict:
+        """InvoiceImage column values describing this blob and its probed metadata"""
+        probe = self.probe or ImageProbe(mime_type=None)
+        return {
+            "file_path": self.file_path,
+            "content_sha256": self.sha256,
+            "file_size": self.file_size,
+            "original_file_size": self.original_size,
+            "mime_type": probe.mime_type,
+            "width": probe.width,
+            "height": probe.height,
+            "exif_gps_latitude": probe.gps_latitude,
+            "exif_gps_longitude": probe.gps_longitude,
+            "taken_at": probe.taken_at,
+        }
+
+
+def blob_key(sha256: str) -> str:
+    """Return the sharded storage key for a content hash (blobs/ab/cd/abcd...)"""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+@lru_cache
+def _exif_timezone() -> ZoneInfo:
+    """Zone assumed for EXIF capture times recorded without an offset"""
+    return ZoneInfo(settings.EXIF_DEFAULT_TIMEZONE)
+
+
+def probe_head(head: bytes) -> ImageProbe:
+    """Probe the first bytes of an upload; raises UnsupportedImageError for non-images"""
+    return probe_image(head, default_tz=_exif_timezone())
+
+
+def probe_file(path: str) -> ImageProbe:
+    """Probe a local file by reading only its header"""
+    with open(path, "rb") as fd:
+        return probe_head(fd.read(PROBE_HEAD_SIZE))
+
+
+def _with_stored_dimensions(probe: ImageProbe, stored_path: str) -> ImageProbe:
+    """
+    Take width and height from the normalized file, keeping the GPS and capture
+    time read from the original (normalization strips EXIF)
+    """
+    stored = probe_file(stored_path)
+    return probe._replace(mime_type=stored.mime_type, width=stored.width, height=stored.height)
+
+
+def _temp_upload_path() -> str:
+    """Return a unique local path for an upload that is still being written"""
+    temp_dir = os.path.join(settings.UPLOAD_TEMP_DIR, ".tmp")
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, f"{uuid.uuid4()}.tmp")
+
+
+def _register_blob(sha256: str, key: str, file_size: int, content_type: Optional[str]) -> None:
+    """
+    Make sure the blob has a row and mark it as in use, in a short transaction of its own
+    This runs before the stored object is looked at. cleanup_uploads deletes an object while
+    holding its row lock, so either the object is already gone and is stored again below, or
+    last_used_at is fresh and the object is kept for BLOB_GC_GRACE_SECONDS
+    """
+    stmt = pg_insert(ImageBlob).values(
+        sha256=sha256, file_path=key, file_size=file_size, mime_type=content_type, ref_count=0
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=[ImageBlob.sha256], set_={"last_used_at": func.now()})
+    with SessionLocal() as db:
+        db.execute(stmt)
+        db.commit()
+
+
+def _place_blob(
+    temp_path: str,
+    sha256: str,
+    file_size: int,
+    content_type: Optional[str] = None,
+    keep_source: bool = False
+) -> StoredBlob:
+    """
+    Hand a fully written local file to the storage backend under its content key,
+    dropping it if that content is already stored
+    With keep_source the local file is left in place, so the caller can still retry from it
+    Stored objects are never removed on the request path, even if the request fails: another
+    request may be using the same content. cleanup_uploads removes them once unreferenced
+    """
+    storage = get_storage()
+    key = blob_key(sha256)
+    _register_blob(sha256, key, file_size, content_type)
+    if storage.exists(key):
+        if not keep_source:
+            os.remove(temp_path)
+        return StoredBlob(key, file_size, sha256, created=False)
+
+    created = storage.put_file(temp_path, key, content_type=content_type, keep_source=keep_source)
+    return StoredBlob(key, file_size, sha256, created=created)
+
+
+def partial_upload_path(session_id: uuid.UUID) -> str:
+    """Return the path of the partial file backing a resumable upload session"""
+    partial_dir = os.path.join(settings.UPLOAD_TEMP_DIR, ".partial")
+    os.makedirs(partial_dir, exist_ok=True)
+    return os.path.join(partial_dir, f"{session_id}.part")
+
+
+def _open_at(path: str, offset: int) -> BinaryIO:
+    """Open a partial file for writing at offset, discarding anything past it"""
+    fd = open(path, "r+b" if os.path.exists(path) else "w+b")
+    fd.truncate(offset)
+    fd.seek(offset)
+    return fd
+
+
+def _flush_and_close(fd: BinaryIO) -> None:
+    """Make written bytes durable before the new offset is recorded"""
+    try:
+        fd.flush()
+        os.fsync(fd.fileno())
+    finally:
+        fd.close()
+
+
+async def stage_stream(
+    stream: AsyncIterator[bytes],
+    max_bytes: int,
+    chunk_size: Optional[int] = None
+) -> tuple[str, int]:
+    """
+    Write an async byte stream to a private staging file and return (path, bytes written)
+    Bytes received before a client disconnect are kept so the upload can resume from them
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    path = await run_in_threadpool(_temp_upload_path)
+    fd = await run_in_threadpool(open, path, "wb")
+    written = 0
+    buffer = bytearray()
+    try:
+        try:
+            async for chunk in stream:
+                if written + len(buffer) + len(chunk) > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                buffer += chunk
+                if len(buffer) >= chunk_size:
+                    await run_in_threadpool(fd.write, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+        except ClientDisconnect:
+            pass
+        if buffer:
+            await run_in_threadpool(fd.write, bytes(buffer))
+            written += len(buffer)
+    except BaseException:
+        await run_in_threadpool(fd.close)
+        remove_files([path])
+        raise
+    await run_in_threadpool(fd.close)
+    return path, written
+
+
+def append_staged(staged_path: str, path: str, offset: int) -> None:
+    """
+    Copy a staged chunk into a partial file at offset, discarding anything past it
+    Callers hold the session row lock, so only one chunk is ever written at a time
+    """
+    fd = _open_at(path, offset)
+    try:
+        with open(staged_path, "rb") as staged:
+            for chunk in iter(lambda: staged.read(settings.UPLOAD_CHUNK_SIZE), b""):
+                fd.write(chunk)
+    finally:
+        _flush_and_close(fd)
+
+
+def _copy_to_temp(src: BinaryIO, max_size: int, chunk_size: int) -> tuple[str, int, str, ImageProbe]:
+    """
+    Copy a file object to a staging file in fixed-size chunks, hashing it on the way
+    The header is probed as soon as it has been read, so non-images are rejected
+    without copying the rest
+    Returns (temp_path, file_size, sha256, probe)
+    """
+    src.seek(0)
+    temp_path = _temp_upload_path()
+    digest = hashlib.sha256()
+    written = 0
+    head = b""
+    probe = None
+    try:
+        with open(temp_path, "wb") as buffer:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_size:
+                    raise UploadTooLargeError(max_size)
+                if probe is None:
+                    head += chunk[:PROBE_HEAD_SIZE - len(head)]
+                    if len(head) >= PROBE_HEAD_SIZE:
+                        probe = probe_head(head)
+                digest.update(chunk)
+                buffer.write(chunk)
+        if probe is None:
+            # The whole file is shorter than the probe window
+            probe = probe_head(head)
+    except BaseException:
+        # Never leave a partial file behind
+        remove_files([temp_path])
+        raise
+    return temp_path, written, digest.hexdigest(), probe
+
+
+def _hash_file(path: str) -> str:
+    """SHA-256 of a local file, read in bounded chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_file_as_blob(path: str, keep_source: bool = False) -> StoredBlob:
+    """
+    Place an already written local file (e.g. a finished resumable upload) in blob storage
+    Normalizes the image first when IMAGE_NORMALIZE_ENABLED is set; the source file is
+    left untouched when keep_source is set
+    Raises UnsupportedImageError if the file is not an accepted image format
+    """
+    original_size = os.path.getsize(path)
+    probe = probe_file(path)
+    if settings.IMAGE_NORMALIZE_ENABLED:
+        normalized_path = _temp_upload_path()
+        normalized_size = normalize_file(path, normalized_path)
+        if normalized_size is not None:
+            try:
+                probe = _with_stored_dimensions(probe, normalized_path)
+                blob = _place_blob(normalized_path, _hash_file(normalized_path), normalized_size, probe.mime_type)
+            except BaseException:
+                remove_files([normalized_path])
+                raise
+            if not keep_source:
+                remove_files([path])
+            return blob._replace(original_size=original_size, probe=probe)
+
+    blob = _place_blob(path, _hash_file(path), original_size, probe.mime_type, keep_source=keep_source)
+    return blob._replace(original_size=original_size, probe=probe)
+
+
+async def save_upload_file(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> StoredBlob:
+    """
+    Stream an uploaded file into content-addressed storage on a worker thread
+    The SHA-256 is computed while copying and memory use is bounded by chunk_size
+    When IMAGE_NORMALIZE_ENABLED is set the staged file is re-encoded in the image process pool first
+    The format is taken from the file's magic bytes, not the client's content type;
+    raises UnsupportedImageError for anything that is not an accepted image
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    # Reject before copying anything if the spooled size is already known
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLargeError(max_size)
+
+    temp_path, file_size, sha256, probe = await run_in_threadpool(_copy_to_temp, file.file, max_size, chunk_size)
+    stored_size = file_size
+    try:
+        if settings.IMAGE_NORMALIZE_ENABLED:
+            normalized_path = _temp_upload_path()
+            normalized_size = await normalize_file_async(temp_path, normalized_path)
+            if normalized_size is not None:
+                remove_files([temp_path])
+                temp_path, stored_size = normalized_path, normalized_size
+                probe = await run_in_threadpool(_with_stored_dimensions, probe, temp_path)
+                sha256 = await run_in_threadpool(_hash_file, temp_path)
+
+        blob = await run_in_threadpool(_place_blob, temp_path, sha256, stored_size, probe.mime_type)
+    except BaseException:
+        remove_files([temp_path])
+        raise
+    return blob._replace(original_size=file_size, probe=probe)
+
+
+def remove_files(paths: List[str]) -> None:
+    """Best-effort removal of files written for a request that did not complete"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def save_upload_files(files: List[UploadFile]) -> List[StoredBlob]:
+    """
+    Stream several uploaded files into blob storage concurrently
+    Returns one StoredBlob per file in input order; blobs stored before a failure are left
+    to cleanup_uploads
+    """
+    results = await asyncio.gather(
+        *(save_upload_file(file) for file in files),
+        return_exceptions=True
+    )
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+    return results
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject multipart requests whose Content-Length exceeds the upload limit
+    This runs before the body is read, so oversized uploads are never spooled
+    """
+
+    def __init__(self, app, max_size: Optional[int] = None):
+        self.app = app
+        self.max_size = max_size or settings.MAX_UPLOAD_SIZE * settings.MAX_UPLOAD_FILES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"")
+            content_length = headers.get(b"content-length")
+            if content_type.startswith(b"multipart/form-data") and content_length is not None:
+                try:
+                    too_large = int(content_length) > self.max_size + MULTIPART_OVERHEAD
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": f"Request exceeds maximum upload size of {self.max_size} bytes"}
+                    )
+                    await response(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,114 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.user import User
+
+
+class AuthUser(NamedTuple):
+    """The user fields needed to authenticate and authorize a request"""
+    id: uuid.UUID
+    username: str
+    role: Optional[str]
+    location_id: Optional[uuid.UUID]
+    is_active: bool
+    session_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(
+            user.id, user.username, user.role, user.location_id, bool(user.is_active), user.session_version
+        )
+
+
+class UserCache:
+    """
+    Bounded LRU of AuthUser entries that expire after a TTL
+    Entries are dropped when this process updates or deletes the user; other
+    workers pick up changes when the TTL runs out
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[uuid.UUID, tuple[float, AuthUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = metrics.counter("user_cache_hits")
+        self.misses = metrics.counter("user_cache_misses")
+        self.evictions = metrics.counter("user_cache_evictions")
+        metrics.register_gauge("user_cache_size", lambda: len(self._entries))
+
+    def get(self, user_id: uuid.UUID) -> Optional[AuthUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits.inc()
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+        self.misses.inc()
+        return None
+
+    def set(self, user: AuthUser) -> None:
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[user.id] = (expires, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+# Called with a user id whenever this process updates or deletes that user
+_change_callbacks: list[Callable[[uuid.UUID], None]] = [user_cache.invalidate]
+
+
+def on_user_changed(callback: Callable[[uuid.UUID], None]) -> None:
+    """Register another in-process cache to be invalidated alongside the user cache"""
+    _change_callbacks.append(callback)
+
+
+def _notify_changed(user_id: uuid.UUID) -> None:
+    for callback in _change_callbacks:
+        callback(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    """Drop the cached entry at flush and again once the change is committed"""
+    _notify_changed(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # A concurrent request may have re-cached the old row between flush and commit
+    for user_id in session.info.pop("changed_user_ids", ()):
+        _notify_changed(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
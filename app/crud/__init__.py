@@ -1,7 +1,7 @@
 """
 CRUD operations for all models
 """
-from app.crud import user, location, category, invoice
+from app.crud import user, location, category, invoice, image_blob, upload_session
 
 __all__ = [
     'user',
@@ -9,4 +9,6 @@ __all__ = [
     'category',
     'invoice',
     'invoice_image',
+    'image_blob',
+    'upload_session',
 ]
@@ -0,0 +1,301 @@
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Awaitable, BinaryIO, Callable, Iterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.bulk_import import ImportReport, validated_batches
+from app.core.config import settings
+from app.core.passwords import hash_password_async, pwd_context
+from app.core.user_cache import user_cache
+from app.schemas.category import CategoryImport
+from app.schemas.location import LocationImport
+from app.schemas.user import UserImport
+
+# Each import COPYs validated rows into a temporary staging table, drops the rows the
+# target table would reject (reporting them by line), then applies the rest with one
+# INSERT ... ON CONFLICT statement; everything runs in a single transaction
+
+LOCATION_STAGING = """
+    CREATE TEMP TABLE import_locations (
+        line integer NOT NULL,
+        code text NOT NULL,
+        name text NOT NULL,
+        address text,
+        gps_latitude double precision,
+        gps_longitude double precision
+    ) ON COMMIT DROP
+"""
+
+LOCATION_UPSERT = """
+    WITH upserted AS (
+        INSERT INTO locations (id, code, name, address, gps_latitude, gps_longitude)
+        SELECT gen_random_uuid(), code, name, address, gps_latitude, gps_longitude
+        FROM import_locations
+        ON CONFLICT (code) DO UPDATE SET
+            name = EXCLUDED.name,
+            address = EXCLUDED.address,
+            gps_latitude = EXCLUDED.gps_latitude,
+            gps_longitude = EXCLUDED.gps_longitude
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+
+CATEGORY_STAGING = """
+    CREATE TEMP TABLE import_categories (
+        line integer NOT NULL,
+        code text NOT NULL,
+        name text NOT NULL,
+        icon_name text,
+        description text,
+        is_active boolean NOT NULL
+    ) ON COMMIT DROP
+"""
+
+CATEGORY_UPSERT = """
+    WITH upserted AS (
+        INSERT INTO categories (code, name, icon_name, description, is_active)
+        SELECT code, name, icon_name, description, is_active
+        FROM import_categories
+        ON CONFLICT (code) DO UPDATE SET
+            name = EXCLUDED.name,
+            icon_name = EXCLUDED.icon_name,
+            description = EXCLUDED.description,
+            is_active = EXCLUDED.is_active
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+
+USER_STAGING = """
+    CREATE TEMP TABLE import_users (
+        line integer NOT NULL,
+        username text NOT NULL,
+        email text NOT NULL,
+        full_name text,
+        avatar_url text,
+        role text NOT NULL,
+        location_code text,
+        password_hash text
+    ) ON COMMIT DROP
+"""
+
+# Rows removed from import_users before the upsert, with the message reported for each
+USER_CHECKS = [
+    (
+        """
+        DELETE FROM import_users s
+        WHERE s.location_code IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM locations l WHERE l.code = s.location_code)
+        RETURNING s.line
+        """,
+        "location_code: unknown location",
+    ),
+    (
+        """
+        DELETE FROM import_users s
+        USING (SELECT email, max(line) AS line FROM import_users GROUP BY email) k
+        WHERE s.email = k.email AND s.line < k.line
+        RETURNING s.line
+        """,
+        "email: repeated later in the file",
+    ),
+    (
+        """
+        DELETE FROM import_users s
+        USING users u
+        WHERE u.email = s.email AND u.username <> s.username
+        RETURNING s.line
+        """,
+        "email: already used by another user",
+    ),
+    (
+        """
+        DELETE FROM import_users s
+        WHERE s.password_hash IS NULL
+          AND NOT EXISTS (SELECT 1 FROM users u WHERE u.username = s.username)
+        RETURNING s.line
+        """,
+        "password: required for new users",
+    ),
+]
+
+# An empty password_hash keeps the stored one; NOT NULL is checked before ON CONFLICT
+USER_UPSERT = """
+    INSERT INTO users (id, username, email, password_hash, full_name, avatar_url, role, is_active, location_id)
+    SELECT gen_random_uuid(), s.username, s.email, COALESCE(s.password_hash, ''), s.full_name, s.avatar_url,
+           s.role, true, l.id
+    FROM import_users s
+    LEFT JOIN locations l ON l.code = s.location_code
+    ON CONFLICT (username) DO UPDATE SET
+        email = EXCLUDED.email,
+        full_name = EXCLUDED.full_name,
+        avatar_url = EXCLUDED.avatar_url,
+        role = EXCLUDED.role,
+        location_id = EXCLUDED.location_id,
+        password_hash = COALESCE(NULLIF(EXCLUDED.password_hash, ''), users.password_hash),
+        updated_at = now()
+    RETURNING id, (xmax = 0) AS inserted
+"""
+
+
+async def _copy_records(db: AsyncSession, table: str, columns: list[str], records: list[tuple]) -> None:
+    """COPY records into a table over the session's own asyncpg connection"""
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def _report_removed(db: AsyncSession, report: ImportReport, sql: str, message: str) -> None:
+    """Run a DELETE ... RETURNING line against a staging table and report each removed row"""
+    result = await db.execute(text(sql))
+    for (line,) in result:
+        report.add_error(line, [message])
+
+
+async def _remove_duplicates(db: AsyncSession, report: ImportReport, table: str, key: str) -> None:
+    """Keep only the last row for each key, as ON CONFLICT cannot touch a row twice"""
+    result = await db.execute(text(f"""
+        DELETE FROM {table} s
+        USING (SELECT {key}, max(line) AS line FROM {table} GROUP BY {key}) k
+        WHERE s.{key} = k.{key} AND s.line < k.line
+        RETURNING s.line, k.line
+    """))
+    for line, kept in result:
+        report.add_error(line, [f"{key}: superseded by line {kept}"])
+
+
+async def _record_batches(
+    file: BinaryIO,
+    fmt: str,
+    schema: Type[BaseModel],
+    report: ImportReport,
+    to_records: Callable[[list[tuple[int, BaseModel]]], Awaitable[list[tuple]]]
+) -> AsyncIterator[list[tuple]]:
+    """Validate the file batch by batch and yield the staging records of each batch"""
+    batches: Iterator = validated_batches(file, fmt, schema, report)
+    while True:
+        # Parsing is blocking, so each batch is read on a worker thread
+        batch = await run_in_threadpool(next, batches, None)
+        if batch is None:
+            break
+        records = await to_records(batch)
+        if records:
+            yield records
+
+
+async def _stage(
+    db: AsyncSession,
+    staging_sql: str,
+    table: str,
+    columns: list[str],
+    batches: AsyncIterable[list[tuple]]
+) -> None:
+    """Create the staging table and COPY the record batches into it"""
+    await db.execute(text(staging_sql))
+    async for records in batches:
+        await _copy_records(db, table, ["line"] + columns, records)
+
+
+async def _apply(db: AsyncSession, report: ImportReport, upsert_sql: str) -> None:
+    """Run a counting upsert and commit"""
+    inserted, updated = (await db.execute(text(upsert_sql))).one()
+    report.inserted, report.updated = inserted, updated
+    await db.commit()
+
+
+async def import_locations(db: AsyncSession, file: BinaryIO, fmt: str) -> ImportReport:
+    """Insert or update locations by code from a CSV or NDJSON file"""
+    report = ImportReport()
+    columns = ["code", "name", "address", "gps_latitude", "gps_longitude"]
+
+    async def to_records(batch):
+        return [(line, *(getattr(row, column) for column in columns)) for line, row in batch]
+
+    try:
+        batches = _record_batches(file, fmt, LocationImport, report, to_records)
+        await _stage(db, LOCATION_STAGING, "import_locations", columns, batches)
+        await _remove_duplicates(db, report, "import_locations", "code")
+        await _apply(db, report, LOCATION_UPSERT)
+    except Exception:
+        await db.rollback()
+        raise
+    return report
+
+
+async def import_categories(db: AsyncSession, file: BinaryIO, fmt: str) -> ImportReport:
+    """Insert or update categories by code from a CSV or NDJSON file"""
+    report = ImportReport()
+    columns = ["code", "name", "icon_name", "description", "is_active"]
+
+    async def to_records(batch):
+        return [(line, *(getattr(row, column) for column in columns)) for line, row in batch]
+
+    try:
+        batches = _record_batches(file, fmt, CategoryImport, report, to_records)
+        await _stage(db, CATEGORY_STAGING, "import_categories", columns, batches)
+        await _remove_duplicates(db, report, "import_categories", "code")
+        await _apply(db, report, CATEGORY_UPSERT)
+    except Exception:
+        await db.rollback()
+        raise
+    return report
+
+
+async def import_users(db: AsyncSession, file: BinaryIO, fmt: str) -> ImportReport:
+    """
+    Insert or update users by username from a CSV or NDJSON file
+    Plain passwords are hashed on the bcrypt pool, leaving one worker free for logins, and
+    all of them before the transaction opens, so the connection and staging table are not
+    held while bcrypt runs. The hashed rows are kept in memory until then; large files
+    should carry password_hash instead of password, or go through scripts/import_data.py
+    """
+    report = ImportReport()
+    columns = ["username", "email", "full_name", "avatar_url", "role", "location_code", "password_hash"]
+    hashing = asyncio.Semaphore(max(1, settings.PASSWORD_HASH_WORKERS - 1))
+
+    async def password_hash(line: int, row: UserImport):
+        if row.password_hash is not None:
+            if pwd_context.identify(row.password_hash, required=False) is None:
+                report.add_error(line, ["password_hash: not a bcrypt hash"])
+                return False
+            return row.password_hash
+        if row.password is None:
+            return None
+        async with hashing:
+            return await hash_password_async(row.password)
+
+    async def to_records(batch):
+        hashes = await asyncio.gather(*(password_hash(line, row) for line, row in batch))
+        return [
+            (line, row.username, row.email, row.full_name, row.avatar_url, row.role, row.location_code, hashed)
+            for (line, row), hashed in zip(batch, hashes) if hashed is not False
+        ]
+
+    prepared = [records async for records in _record_batches(file, fmt, UserImport, report, to_records)]
+
+    async def batches():
+        for records in prepared:
+            yield records
+
+    try:
+        await _stage(db, USER_STAGING, "import_users", columns, batches())
+        await _remove_duplicates(db, report, "import_users", "username")
+        for sql, message in USER_CHECKS:
+            await _report_removed(db, report, sql, message)
+        rows = (await db.execute(text(USER_UPSERT))).all()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    report.inserted = sum(1 for row in rows if row.inserted)
+    report.updated = len(rows) - report.inserted
+    # Other workers pick the changes up through updated_at in the session registry
+    for row in rows:
+        if not row.inserted:
+            user_cache.invalidate(row.id)
+    return report
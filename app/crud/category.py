@@ -1,24 +1,26 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.models.category import Category
 from app.schemas.category import CategoryCreate
 
 
-def get_category_by_code(db: Session, code: str) -> Optional[Category]:
+async def get_category_by_code(db: AsyncSession, code: str) -> Optional[Category]:
     """Get a category by code"""
-    return db.query(Category).filter(Category.code == code).first()
+    return await db.scalar(select(Category).where(Category.code == code).limit(1))
 
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100, active_only: bool = False) -> list[Category]:
+async def get_categories(db: AsyncSession, skip: int = 0, limit: int = 100, active_only: bool = False) -> list[Category]:
     """Get all categories with pagination"""
-    query = db.query(Category)
+    query = select(Category)
     if active_only:
-        query = query.filter(Category.is_active == True)
-    return query.offset(skip).limit(limit).all()
+        query = query.where(Category.is_active == True)
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return list(result)
 
 
-def create_category(db: Session, category: CategoryCreate) -> Category:
+async def create_category(db: AsyncSession, category: CategoryCreate) -> Category:
     """Create a new category"""
     db_category = Category(
         name=category.name,
@@ -28,6 +30,6 @@ def create_category(db: Session, category: CategoryCreate) -> Category:
         is_active=category.is_active
     )
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     return db_category
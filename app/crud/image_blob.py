@@ -0,0 +1,76 @@
+from datetime import timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Callable
+
+from app.core.config import settings
+from app.models.image_blob import ImageBlob
+
+
+async def acquire_blobs(db: AsyncSession, images: list[dict]) -> None:
+    """
+    Upsert blob rows for content-addressed images and add one reference per image
+    Runs inside the caller's transaction; the caller commits
+    """
+    refs: dict[str, dict] = {}
+    for image in images:
+        sha256 = image.get("content_sha256")
+        if not sha256:
+            continue
+        if sha256 in refs:
+            refs[sha256]["ref_count"] += 1
+        else:
+            refs[sha256] = {
+                "sha256": sha256,
+                "file_path": image["file_path"],
+                "file_size": image["file_size"],
+                "mime_type": image.get("mime_type"),
+                "ref_count": 1,
+            }
+    if not refs:
+        return
+
+    stmt = pg_insert(ImageBlob).values(list(refs.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ImageBlob.sha256],
+        set_={"ref_count": ImageBlob.ref_count + stmt.excluded.ref_count}
+    )
+    await db.execute(stmt)
+
+
+def _unreferenced():
+    """Blobs no image references that no upload has used within the grace period"""
+    cutoff = func.now() - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS)
+    return (ImageBlob.ref_count <= 0, ImageBlob.last_used_at < cutoff)
+
+
+async def get_unreferenced_blob_hashes(db: AsyncSession, limit: int = 500) -> list[str]:
+    """Get hashes of blobs that no image references any more"""
+    result = await db.scalars(select(ImageBlob.sha256).where(*_unreferenced()).limit(limit))
+    return list(result)
+
+
+async def delete_unreferenced_blob(db: AsyncSession, sha256: str, delete_object: Callable[[str], None]) -> bool:
+    """
+    Delete a blob row and its stored object if the blob is still unreferenced
+    The conditions are repeated in the DELETE, so a blob an upload touched since it was listed
+    is kept. The object is deleted before the row delete commits: an upload registering the
+    same content waits for that commit on the row lock, then finds no object and stores it again
+    """
+    file_path = await db.scalar(
+        delete(ImageBlob)
+        .where(ImageBlob.sha256 == sha256, *_unreferenced())
+        .returning(ImageBlob.file_path)
+    )
+    if file_path is None:
+        await db.rollback()
+        return False
+    try:
+        await run_in_threadpool(delete_object, file_path)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return True
@@ -1,36 +1,154 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import Optional
+from sqlalchemy import Select, Text, func, insert, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Collection, Optional
+from datetime import datetime
+import json
 import uuid
 
+from app.core.config import settings
+from app.crud import image_blob as image_blob_crud
 from app.models.invoice import Invoice
+from app.models.invoice_image import InvoiceImage
 from app.schemas.invoice import InvoiceCreate
 
 
-def get_invoices(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+# Relationships get_invoices can load with a page; each include costs at most one extra query
+INVOICE_INCLUDES = {
+    "images": selectinload(Invoice.images),
+    "location": joinedload(Invoice.location),
+    "category": joinedload(Invoice.category),
+}
+
+
+def _promoted_value(value) -> Optional[str]:
+    """How a JSON value reads through ->>, or None if it cannot use a promoted column"""
+    if isinstance(value, str):
+        return value
+    # Floats are left to @>; Postgres and Python format them differently
+    if isinstance(value, (bool, int)):
+        return json.dumps(value)
+    return None
+
+
+def meta_filters(contains: Optional[dict] = None, keys: Collection[str] = ()) -> list:
+    """
+    WHERE clauses for extra_metadata: contains is matched with @> (GIN jsonb_path_ops index),
+    keys must all be present at the top level (GIN index on invoice_meta_keys)
+    Keys listed in META_PROMOTED_KEYS are compared on their generated column's B-tree index
+    """
+    filters = []
+    remaining = {}
+    for key, value in (contains or {}).items():
+        column = settings.META_PROMOTED_KEYS.get(key)
+        text_value = _promoted_value(value)
+        if column and text_value is not None:
+            filters.append(literal_column(f"invoices.{column}", Text) == text_value)
+        else:
+            remaining[key] = value
+    if remaining:
+        filters.append(Invoice.extra_metadata.contains(remaining))
+    if keys:
+        # text[] on both sides; a plain array() of strings would be varchar[], which has no @> with text[]
+        meta_keys = func.invoice_meta_keys(Invoice.extra_metadata, type_=ARRAY(Text))
+        filters.append(meta_keys.contains(array(list(keys), type_=Text)))
+    return filters
+
+
+def invoice_filters(
     user_id: Optional[uuid.UUID] = None,
     location_id: Optional[uuid.UUID] = None,
     category_id: Optional[int] = None,
-    status: Optional[str] = None
-) -> list[Invoice]:
-    """Get all invoices with filtering and pagination"""
-    query = db.query(Invoice)
-    
+    status: Optional[str] = None,
+    meta_contains: Optional[dict] = None,
+    meta_keys: Collection[str] = ()
+) -> list:
+    """WHERE clauses for the invoice list filters that are set"""
+    filters = []
     if user_id:
-        query = query.filter(Invoice.user_id == user_id)
+        filters.append(Invoice.user_id == user_id)
     if location_id:
-        query = query.filter(Invoice.location_id == location_id)
+        filters.append(Invoice.location_id == location_id)
     if category_id:
-        query = query.filter(Invoice.category_id == category_id)
+        filters.append(Invoice.category_id == category_id)
     if status:
-        query = query.filter(Invoice.status == status)
+        filters.append(Invoice.status == status)
+    filters.extend(meta_filters(meta_contains, meta_keys))
+    return filters
+
+
+def invoices_query(
+    skip: int = 0,
+    limit: int = 100,
+    user_id: Optional[uuid.UUID] = None,
+    location_id: Optional[uuid.UUID] = None,
+    category_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[tuple[datetime, uuid.UUID]] = None,
+    meta_contains: Optional[dict] = None,
+    meta_keys: Collection[str] = ()
+) -> Select:
+    """Build the get_invoices statement without running it (scripts/check_query_plans.py EXPLAINs it)"""
+    query = select(Invoice).where(
+        *invoice_filters(user_id, location_id, category_id, status, meta_contains, meta_keys)
+    )
+    if after is not None:
+        # The plain bound lets the planner skip partitions newer than the cursor;
+        # it cannot prune on the row comparison alone
+        query = query.where(
+            Invoice.captured_at <= after[0],
+            tuple_(Invoice.captured_at, Invoice.id) < tuple_(*after)
+        )
     
-    return query.order_by(Invoice.captured_at.desc()).offset(skip).limit(limit).all()
+    # id breaks ties between invoices captured in the same instant
+    query = query.order_by(Invoice.captured_at.desc(), Invoice.id.desc())
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+async def get_invoices(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    user_id: Optional[uuid.UUID] = None,
+    location_id: Optional[uuid.UUID] = None,
+    category_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[tuple[datetime, uuid.UUID]] = None,
+    include: Collection[str] = (),
+    meta_contains: Optional[dict] = None,
+    meta_keys: Collection[str] = ()
+) -> list[Invoice]:
+    """
+    Get all invoices with filtering and pagination, newest first
+    after is the (captured_at, id) of the last row of the previous page; seeking past it
+    uses the (captured_at, id) indexes, so every page costs the same as the first; with
+    monthly partitions the scan starts in the cursor's month and stops once the page is full
+    include names INVOICE_INCLUDES relationships to load; images take one SELECT ... IN
+    for the whole page, location and category are joined into the main query
+    meta_contains and meta_keys filter on extra_metadata, see meta_filters
+    """
+    query = invoices_query(
+        skip=skip,
+        limit=limit,
+        user_id=user_id,
+        location_id=location_id,
+        category_id=category_id,
+        status=status,
+        after=after,
+        meta_contains=meta_contains,
+        meta_keys=meta_keys
+    )
+    if include:
+        query = query.options(*(INVOICE_INCLUDES[name] for name in include))
+    result = await db.scalars(query)
+    return list(result)
 
 
-def create_invoice(db: Session, invoice: InvoiceCreate, user_id: uuid.UUID) -> Invoice:
+async def create_invoice(db: AsyncSession, invoice: InvoiceCreate, user_id: uuid.UUID) -> Invoice:
     """Create a new invoice"""
     db_invoice = Invoice(
         user_id=user_id,
@@ -41,24 +159,34 @@ def create_invoice(db: Session, invoice: InvoiceCreate, user_id: uuid.UUID) -> I
         extra_metadata=invoice.extra_metadata
     )
     db.add(db_invoice)
-    db.commit()
-    db.refresh(db_invoice)
+    await db.commit()
+    await db.refresh(db_invoice)
     return db_invoice
 
 
-from app.models.invoice_image import InvoiceImage
+async def get_invoice_image(db: AsyncSession, image_id: uuid.UUID) -> Optional[InvoiceImage]:
+    """Get an image together with its invoice (for authorization) in one query"""
+    return await db.scalar(
+        select(InvoiceImage)
+        .options(joinedload(InvoiceImage.invoice))
+        .where(InvoiceImage.id == image_id)
+    )
+
 
-def get_user_invoices_by_status(db: Session, user_id: uuid.UUID, status: str) -> list[Invoice]:
+async def get_user_invoices_by_status(db: AsyncSession, user_id: uuid.UUID, status: str) -> list[Invoice]:
     """Get all invoices for a user with a specific status"""
-    return db.query(Invoice).filter(
-        Invoice.user_id == user_id,
-        Invoice.status == status
-    ).order_by(Invoice.captured_at.desc()).all()
+    result = await db.scalars(
+        select(Invoice)
+        .where(Invoice.user_id == user_id, Invoice.status == status)
+        .order_by(Invoice.captured_at.desc(), Invoice.id.desc())
+    )
+    return list(result)
 
 
-def add_invoice_image(
-    db: Session,
+async def add_invoice_image(
+    db: AsyncSession,
     invoice_id: uuid.UUID,
+    invoice_captured_at: datetime,
     file_path: str,
     file_name: str,
     file_size: int,
@@ -69,6 +197,7 @@ def add_invoice_image(
     """Add an image to an invoice"""
     db_image = InvoiceImage(
         invoice_id=invoice_id,
+        invoice_captured_at=invoice_captured_at,
         file_path=file_path,
         file_name=file_name,
         file_size=file_size,
@@ -77,7 +206,48 @@ def add_invoice_image(
         gps_longitude=gps_longitude
     )
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    await db.commit()
+    await db.refresh(db_image)
     return db_image
 
+
+async def create_invoice_with_images(
+    db: AsyncSession,
+    invoice: InvoiceCreate,
+    user_id: uuid.UUID,
+    images: list[dict]
+) -> Invoice:
+    """
+    Create an invoice and its images atomically
+    Both rows are inserted with RETURNING in one transaction, so no refresh queries are needed
+    and a failure leaves neither the invoice nor any image behind
+    """
+    try:
+        db_invoice = await db.scalar(
+            insert(Invoice).values(
+                user_id=user_id,
+                location_id=invoice.location_id,
+                category_id=invoice.category_id,
+                status=invoice.status.value,
+                note=invoice.note,
+                extra_metadata=invoice.extra_metadata
+            ).returning(Invoice)
+        )
+        db_images = []
+        if images:
+            # Blob rows must exist before images can reference them
+            await image_blob_crud.acquire_blobs(db, images)
+            # Images live in the partition of their invoice's month
+            rows = [
+                {**image, "invoice_id": db_invoice.id, "invoice_captured_at": db_invoice.captured_at}
+                for image in images
+            ]
+            db_images = list((await db.scalars(insert(InvoiceImage).returning(InvoiceImage), rows)).all())
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    # Populate the relationship from the RETURNING rows instead of lazy loading it
+    set_committed_value(db_invoice, "images", db_images)
+    return db_invoice
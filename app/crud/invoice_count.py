@@ -0,0 +1,93 @@
+from typing import Collection, Optional
+import uuid
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.query_plan import Explain, root_plan
+from app.crud.invoice import invoice_filters
+from app.models.invoice import Invoice
+from app.models.invoice_count import InvoiceCount
+
+
+async def _estimate_rows(db: AsyncSession, filters: list) -> float:
+    """Rows the planner expects the filters to match; costs one EXPLAIN, never a scan"""
+    stmt = select(literal(1)).select_from(Invoice).where(*filters)
+    return root_plan(await db.scalar(Explain(stmt)))["Plan Rows"]
+
+
+async def _grouped(db: AsyncSession, column, total, model, filters: list) -> dict:
+    """{value: count} of total grouped by column"""
+    result = await db.execute(select(column, total).select_from(model).where(*filters).group_by(column))
+    return {value: int(count) for value, count in result if count}
+
+
+def _counter_filters(location_id, category_id, status) -> list:
+    filters = []
+    if location_id:
+        filters.append(InvoiceCount.location_id == location_id)
+    if category_id:
+        filters.append(InvoiceCount.category_id == category_id)
+    if status:
+        filters.append(InvoiceCount.status == status)
+    return filters
+
+
+async def get_invoice_counts(
+    db: AsyncSession,
+    user_id: Optional[uuid.UUID] = None,
+    location_id: Optional[uuid.UUID] = None,
+    category_id: Optional[int] = None,
+    status: Optional[str] = None,
+    meta_contains: Optional[dict] = None,
+    meta_keys: Collection[str] = ()
+) -> dict:
+    """
+    Total, per-status and per-category invoice counts for the get_invoices filters
+    Each facet ignores its own filter, so the status facet still shows every status
+    Strategy, by how many rows the planner expects the widest facet query to touch:
+      exact    - at most INVOICE_COUNT_EXACT_THRESHOLD rows: GROUP BY over invoices
+      counter  - otherwise, without a user filter: sums from the trigger-maintained invoice_counts
+      estimate - otherwise: the planner's row estimate for the user or meta filters, spread
+                 over the location's status and category mix from invoice_counts
+    """
+    meta = {"meta_contains": meta_contains, "meta_keys": meta_keys}
+    widest = invoice_filters(user_id, location_id, **meta)
+    estimated = await _estimate_rows(db, widest)
+
+    if estimated <= settings.INVOICE_COUNT_EXACT_THRESHOLD:
+        source = "exact"
+        total = func.count()
+        by_status = await _grouped(
+            db, Invoice.status, total, Invoice, invoice_filters(user_id, location_id, category_id, **meta)
+        )
+        by_category = await _grouped(
+            db, Invoice.category_id, total, Invoice, invoice_filters(user_id, location_id, status=status, **meta)
+        )
+    else:
+        total = func.sum(InvoiceCount.count)
+        by_status = await _grouped(
+            db, InvoiceCount.status, total, InvoiceCount, _counter_filters(location_id, category_id, None)
+        )
+        by_category = await _grouped(
+            db, InvoiceCount.category_id, total, InvoiceCount, _counter_filters(location_id, None, status)
+        )
+        source = "counter"
+        if user_id or meta_contains or meta_keys:
+            # invoice_counts has no user or metadata dimension; scale the location's mix to the estimate
+            source = "estimate"
+            known = await db.scalar(select(total).where(*_counter_filters(location_id, None, None))) or 0
+            ratio = estimated / known if known else 0
+            by_status = {key: round(count * ratio) for key, count in by_status.items()}
+            by_category = {key: round(count * ratio) for key, count in by_category.items()}
+
+    return {
+        "total": by_status.get(status, 0) if status else sum(by_status.values()),
+        "source": source,
+        "by_status": [{"status": key, "count": count} for key, count in sorted(by_status.items(), key=lambda item: str(item[0]))],
+        "by_category": [
+            {"category_id": key, "count": count}
+            for key, count in sorted(by_category.items(), key=lambda item: (item[0] is None, item[0] or 0))
+        ],
+    }
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from typing import Optional, Sequence
+import uuid
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.invoice_daily_stat import InvoiceDailyStat
+
+ROLLUP_NAME = "invoice_daily_stats"
+
+# Columns a report can be grouped or filtered by
+STAT_DIMENSIONS = {
+    "day": InvoiceDailyStat.day,
+    "location_id": InvoiceDailyStat.location_id,
+    "category_id": InvoiceDailyStat.category_id,
+    "user_id": InvoiceDailyStat.user_id,
+    "status": InvoiceDailyStat.status,
+}
+
+_AFFECTED_TABLE = """
+    CREATE TEMP TABLE rollup_affected (day date, user_id uuid, PRIMARY KEY (day, user_id)) ON COMMIT DROP
+"""
+
+# (day, user) pairs with an invoice created or updated, or an image added, since :since
+_AFFECTED_SINCE = """
+    INSERT INTO rollup_affected
+    SELECT (i.captured_at AT TIME ZONE :tz)::date, i.user_id
+    FROM invoices i
+    WHERE COALESCE(i.updated_at, i.created_at) >= :since
+    UNION
+    SELECT (i.captured_at AT TIME ZONE :tz)::date, i.user_id
+    FROM invoice_images ii
+    JOIN invoices i ON i.id = ii.invoice_id AND i.captured_at = ii.invoice_captured_at
+    WHERE ii.created_at >= :since
+"""
+
+_AFFECTED_FROM_DAY = """
+    INSERT INTO rollup_affected
+    SELECT DISTINCT (captured_at AT TIME ZONE :tz)::date, user_id
+    FROM invoices
+    WHERE captured_at >= CAST(:day AS date)::timestamp AT TIME ZONE :tz
+"""
+
+# Recomputing whole (day, user) groups also moves invoices whose status, location or
+# category changed, without knowing their old values
+_REBUILD = [
+    """
+    DELETE FROM invoice_daily_stats s
+    USING rollup_affected a
+    WHERE s.day = a.day AND s.user_id = a.user_id
+    """,
+    """
+    INSERT INTO invoice_daily_stats (day, user_id, location_id, category_id, status, invoices, images, image_bytes)
+    SELECT a.day, i.user_id, i.location_id, i.category_id, i.status,
+           count(*), COALESCE(sum(img.images), 0), COALESCE(sum(img.bytes), 0)
+    FROM rollup_affected a
+    JOIN invoices i
+      ON i.user_id = a.user_id
+     AND i.captured_at >= a.day::timestamp AT TIME ZONE :tz
+     AND i.captured_at < (a.day + 1)::timestamp AT TIME ZONE :tz
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS images, sum(file_size) AS bytes
+        FROM invoice_images
+        WHERE invoice_id = i.id AND invoice_captured_at = i.captured_at
+    ) img ON true
+    GROUP BY a.day, i.user_id, i.location_id, i.category_id, i.status
+    """,
+]
+
+
+async def refresh_daily_stats(db: AsyncSession, rebuild_from: Optional[date] = None) -> int:
+    """
+    Bring invoice_daily_stats up to date and return how many (day, user) groups were rebuilt
+    Only groups touched since the stored watermark (minus ROLLUP_OVERLAP_SECONDS) are
+    recomputed; the first run, or rebuild_from, recomputes everything from that day on,
+    which also drops invoices deleted by ON DELETE CASCADE
+    """
+    tz = settings.REPORTING_TIMEZONE
+    try:
+        # Concurrent runs would race on the same groups
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": ROLLUP_NAME})
+        started = await db.scalar(text("SELECT now()"))
+        watermark = await db.scalar(
+            text("SELECT watermark FROM rollup_watermarks WHERE name = :name"), {"name": ROLLUP_NAME}
+        )
+
+        await db.execute(text(_AFFECTED_TABLE))
+        if rebuild_from is None and watermark is None:
+            rebuild_from = date.min
+        if rebuild_from is not None:
+            await db.execute(
+                text("DELETE FROM invoice_daily_stats WHERE day >= :day"), {"day": rebuild_from}
+            )
+            await db.execute(text(_AFFECTED_FROM_DAY), {"tz": tz, "day": rebuild_from})
+        else:
+            await db.execute(
+                text(_AFFECTED_SINCE),
+                {"tz": tz, "since": watermark - timedelta(seconds=settings.ROLLUP_OVERLAP_SECONDS)}
+            )
+        affected = await db.scalar(text("SELECT count(*) FROM rollup_affected"))
+
+        for statement in _REBUILD:
+            await db.execute(text(statement), {"tz": tz})
+        await db.execute(
+            text("""
+                INSERT INTO rollup_watermarks (name, watermark) VALUES (:name, :watermark)
+                ON CONFLICT (name) DO UPDATE SET watermark = EXCLUDED.watermark
+            """),
+            {"name": ROLLUP_NAME, "watermark": started}
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return affected
+
+
+async def get_daily_stats(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    group_by: Sequence[str] = ("day",),
+    location_id: Optional[uuid.UUID] = None,
+    category_id: Optional[int] = None,
+    user_id: Optional[uuid.UUID] = None,
+    status: Optional[str] = None
+) -> list[dict]:
+    """Invoice, image and byte totals between start and end inclusive, grouped by STAT_DIMENSIONS names"""
+    columns = [STAT_DIMENSIONS[name].label(name) for name in group_by]
+    query = (
+        select(
+            *columns,
+            func.sum(InvoiceDailyStat.invoices).label("invoices"),
+            func.sum(InvoiceDailyStat.images).label("images"),
+            func.sum(InvoiceDailyStat.image_bytes).label("image_bytes"),
+        )
+        .where(InvoiceDailyStat.day >= start, InvoiceDailyStat.day <= end)
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if location_id:
+        query = query.where(InvoiceDailyStat.location_id == location_id)
+    if category_id:
+        query = query.where(InvoiceDailyStat.category_id == category_id)
+    if user_id:
+        query = query.where(InvoiceDailyStat.user_id == user_id)
+    if status:
+        query = query.where(InvoiceDailyStat.status == status)
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
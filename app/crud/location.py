@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import uuid
 
@@ -6,22 +7,33 @@ from app.models.location import Location
 from app.schemas.location import LocationCreate
 
 
-def get_location_by_code(db: Session, code: str) -> Optional[Location]:
+async def get_location_by_code(db: AsyncSession, code: str) -> Optional[Location]:
     """Get a location by code"""
-    return db.query(Location).filter(Location.code == code).first()
+    return await db.scalar(select(Location).where(Location.code == code).limit(1))
 
 
-def get_location(db: Session, location_id: uuid.UUID) -> Optional[Location]:
+async def get_location(db: AsyncSession, location_id: uuid.UUID) -> Optional[Location]:
     """Get a location by ID"""
-    return db.query(Location).filter(Location.id == location_id).first()
+    return await db.get(Location, location_id)
 
 
-def get_locations(db: Session, skip: int = 0, limit: int = 100) -> list[Location]:
+async def get_location_gps(db: AsyncSession, location_id: uuid.UUID) -> tuple[Optional[float], Optional[float]]:
+    """Get a location's GPS coordinates as floats"""
+    location = await get_location(db, location_id=location_id)
+    if location is None:
+        return None, None
+    gps_latitude = float(location.gps_latitude) if location.gps_latitude is not None else None
+    gps_longitude = float(location.gps_longitude) if location.gps_longitude is not None else None
+    return gps_latitude, gps_longitude
+
+
+async def get_locations(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Location]:
     """Get all locations with pagination"""
-    return db.query(Location).offset(skip).limit(limit).all()
+    result = await db.scalars(select(Location).offset(skip).limit(limit))
+    return list(result)
 
 
-def create_location(db: Session, location: LocationCreate) -> Location:
+async def create_location(db: AsyncSession, location: LocationCreate) -> Location:
     """Create a new location"""
     db_location = Location(
         name=location.name,
@@ -32,6 +44,6 @@ def create_location(db: Session, location: LocationCreate) -> Location:
     )
     
     db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
+    await db.commit()
+    await db.refresh(db_location)
     return db_location
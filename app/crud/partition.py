@@ -0,0 +1,193 @@
+from datetime import date
+from typing import Optional
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+
+# Both tables are partitioned by month of the invoice's captured_at (invoice_images
+# through invoice_captured_at), so a month of invoices and its images leave together
+PARTITIONED_TABLES = ("invoices", "invoice_images")
+
+_PARTITION_NAME = re.compile(r"^(invoices|invoice_images)_p(\d{4})_(\d{2})$")
+
+_CHILDREN = """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:table AS regclass)
+"""
+
+# Plain tables named like partitions that are no longer attached to a parent
+_DETACHED = """
+    SELECT c.relname
+    FROM pg_class c
+    WHERE c.relkind = 'r'
+      AND c.relnamespace = CAST(current_schema() AS regnamespace)
+      AND c.relname LIKE :prefix
+      AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+"""
+
+_INDEX_VALID = """
+    SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)
+"""
+
+_FOREIGN_KEYS_TO = """
+    SELECT conname FROM pg_constraint
+    WHERE conrelid = CAST(:table AS regclass) AND confrelid = CAST(:referenced AS regclass) AND contype = 'f'
+"""
+
+
+def month_start(day: date) -> date:
+    """First day of day's month"""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month the given number of months after month (negative for before)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of table's partition for month, e.g. invoices_p2026_10"""
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not partitioned")
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_ddl(table: str, month: date) -> str:
+    """CREATE TABLE for one monthly partition; bounds are UTC month starts"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def _parse_months(names, table: str) -> list[date]:
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match and match.group(1) == table:
+            months.append(date(int(match.group(2)), int(match.group(3)), 1))
+    return sorted(months)
+
+
+async def get_partition_months(db: AsyncSession, table: str = "invoices") -> list[date]:
+    """Months with a partition attached to table, oldest first"""
+    result = await db.scalars(text(_CHILDREN), {"table": table})
+    return _parse_months(result, table)
+
+
+async def get_detached_months(db: AsyncSession, table: str = "invoices") -> list[date]:
+    """Months whose partition of table was detached but not yet dropped"""
+    result = await db.scalars(text(_DETACHED), {"prefix": table.replace("_", r"\_") + r"\_p%"})
+    return _parse_months(result, table)
+
+
+async def _set_lock_timeout(db: AsyncSession) -> None:
+    # Partition DDL locks the parent; give up rather than queue every query behind it
+    await db.execute(text(f"SET LOCAL lock_timeout = '{int(settings.PARTITION_LOCK_TIMEOUT_MS)}ms'"))
+
+
+async def create_partitions(db: AsyncSession, month: date) -> None:
+    """Create the invoices and invoice_images partitions for one month"""
+    try:
+        await _set_lock_timeout(db)
+        for table in PARTITIONED_TABLES:
+            await db.execute(text(partition_ddl(table, month)))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def detach_partitions(db: AsyncSession, month: date) -> None:
+    """
+    Detach one month from invoices and invoice_images, keeping the tables for archiving
+    invoice_counts is decremented for the detached invoices, since no DELETE triggers fire
+    """
+    invoices = partition_name("invoices", month)
+    images = partition_name("invoice_images", month)
+    try:
+        await _set_lock_timeout(db)
+        await db.execute(text(f"ALTER TABLE invoice_images DETACH PARTITION {images}"))
+        # The detached images still reference invoices, which would block detaching them
+        for name in (await db.scalars(text(_FOREIGN_KEYS_TO), {"table": images, "referenced": "invoices"})).all():
+            await db.execute(text(f'ALTER TABLE {images} DROP CONSTRAINT "{name}"'))
+        await db.execute(text(f"ALTER TABLE invoices DETACH PARTITION {invoices}"))
+        await db.execute(text(f"""
+            SELECT invoice_counts_add(location_id, category_id, status, -count(*)::integer)
+            FROM {invoices}
+            GROUP BY location_id, category_id, status
+        """))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def get_unshared_file_paths(
+    db: AsyncSession,
+    month: date,
+    after: Optional[str] = None,
+    limit: int = 1000
+) -> list[str]:
+    """
+    File paths of a detached month's images that are not content-addressed blobs, in pages
+    These predate blob storage and are local paths including UPLOAD_DIR, not storage keys.
+    Blob files are shared and are removed by cleanup_uploads once unreferenced
+    """
+    images = partition_name("invoice_images", month)
+    query = f"SELECT file_path FROM {images} WHERE content_sha256 IS NULL"
+    params = {"limit": limit}
+    if after is not None:
+        query += " AND file_path > :after"
+        params["after"] = after
+    result = await db.scalars(text(query + " ORDER BY file_path LIMIT :limit"), params)
+    return list(result)
+
+
+async def drop_detached_partitions(db: AsyncSession, month: date) -> None:
+    """Drop a detached month and release its image_blobs references"""
+    images = partition_name("invoice_images", month)
+    try:
+        await db.execute(text(f"""
+            UPDATE image_blobs b
+            SET ref_count = b.ref_count - r.refs
+            FROM (
+                SELECT content_sha256, count(*) AS refs
+                FROM {images}
+                WHERE content_sha256 IS NOT NULL
+                GROUP BY content_sha256
+            ) r
+            WHERE b.sha256 = r.content_sha256
+        """))
+        await db.execute(text(f"DROP TABLE {images}"))
+        await db.execute(text(f"DROP TABLE {partition_name('invoices', month)}"))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+async def create_partitioned_index(conn: AsyncConnection, table: str, name: str, definition: str) -> None:
+    """
+    Build an index on a partitioned table without blocking writes
+    An invalid parent index is created ON ONLY table, then each partition's index is built
+    CONCURRENTLY and attached; the parent becomes valid once every partition has one, and
+    partitions created later get theirs automatically. conn must be in AUTOCOMMIT mode;
+    re-running resumes where a failed run stopped.
+    definition is the rest of CREATE INDEX after the table, e.g. "USING gin (extra_metadata)"
+    """
+    await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}"))
+    suffix = name.removeprefix(f"ix_{table}_")
+    for partition in (await conn.scalars(text(_CHILDREN), {"table": table})).all():
+        child = f"{partition}_{suffix}"
+        if (await conn.scalar(text(_INDEX_VALID), {"name": child})) is False:
+            # Left behind by an interrupted CONCURRENTLY build
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY {child}"))
+        await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}"))
+        await conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
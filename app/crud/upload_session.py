@@ -0,0 +1,90 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+import uuid
+
+from app.core.config import settings
+from app.core.uploads import partial_upload_path
+from app.models.upload_session import UploadSession
+from app.schemas.upload_session import UploadSessionCreate
+
+
+def _new_expiry() -> datetime:
+    """Expiry timestamp for a session that was just touched"""
+    return datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+async def get_upload_session(db: AsyncSession, session_id: uuid.UUID, user_id: uuid.UUID) -> Optional[UploadSession]:
+    """Get an upload session owned by a user"""
+    return await db.scalar(
+        select(UploadSession).where(
+            UploadSession.id == session_id,
+            UploadSession.user_id == user_id
+        )
+    )
+
+
+async def create_upload_session(db: AsyncSession, upload: UploadSessionCreate, user_id: uuid.UUID) -> UploadSession:
+    """Create a new resumable upload session"""
+    session_id = uuid.uuid4()
+    db_upload = UploadSession(
+        id=session_id,
+        user_id=user_id,
+        category_id=upload.category_id,
+        note=upload.note,
+        invoice_status=upload.status.value,
+        file_name=upload.file_name,
+        mime_type=upload.mime_type,
+        upload_length=upload.upload_length,
+        upload_offset=0,
+        temp_path=partial_upload_path(session_id),
+        expires_at=_new_expiry()
+    )
+    db.add(db_upload)
+    await db.commit()
+    await db.refresh(db_upload)
+    return db_upload
+
+
+async def advance_upload_offset(
+    db: AsyncSession,
+    session_id: uuid.UUID,
+    expected_offset: int,
+    new_offset: int,
+    commit: bool = True
+) -> bool:
+    """
+    Move a session's offset forward if nobody else has moved it since expected_offset
+    Returns False when another request won the race
+    With commit=False the updated row stays locked until the caller commits, so the
+    bytes can be written while competing requests wait on the row
+    """
+    result = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == session_id, UploadSession.upload_offset == expected_offset)
+        .values(upload_offset=new_offset, expires_at=_new_expiry())
+    )
+    if commit:
+        await db.commit()
+    return result.rowcount == 1
+
+
+async def delete_upload_session(db: AsyncSession, db_upload: UploadSession, commit: bool = True) -> None:
+    """Delete an upload session row, optionally leaving the commit to the caller's unit of work"""
+    await db.delete(db_upload)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+
+async def get_expired_upload_sessions(db: AsyncSession, limit: int = 500) -> list[UploadSession]:
+    """Get upload sessions whose expiry has passed"""
+    result = await db.scalars(
+        select(UploadSession)
+        .where(UploadSession.expires_at < datetime.now(timezone.utc))
+        .order_by(UploadSession.expires_at)
+        .limit(limit)
+    )
+    return list(result)
@@ -1,49 +1,43 @@
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import DateTime, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import Optional
 import uuid
 from datetime import datetime
 
+from app.core.passwords import hash_password_async, verify_and_update_password
 from app.models.user import User
 from app.schemas.user import UserCreate
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+async def get_user(db: AsyncSession, user_id: uuid.UUID, with_location: bool = False) -> Optional[User]:
+    """Get a user by ID, optionally with its location (needed for UserResponse)"""
+    query = select(User).where(User.id == user_id)
+    if with_location:
+        query = query.options(selectinload(User.location))
+    return await db.scalar(query)
 
-def hash_password(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_user(db: Session, user_id: uuid.UUID) -> Optional[User]:
-    """Get a user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
-
-
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Get a user by username"""
-    return db.query(User).filter(User.username == username).first()
+    return await db.scalar(select(User).where(User.username == username))
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get a user by email"""
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).where(User.email == email))
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
-    """Get all users with pagination"""
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[User]:
+    """Get all users with pagination, locations included"""
+    result = await db.scalars(select(User).options(selectinload(User.location)).offset(skip).limit(limit))
+    return list(result)
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """Create a new user"""
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -54,27 +48,70 @@ def create_user(db: Session, user: UserCreate) -> User:
         location_id=user.location_id
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    # Reload server defaults together with the location the response includes
+    await db.refresh(db_user)
+    await db.refresh(db_user, attribute_names=["location"])
     return db_user
 
 
-def update_last_login(db: Session, user_id: uuid.UUID) -> None:
-    """Update user's last login timestamp"""
-    db_user = get_user(db, user_id)
-    if db_user:
-        db_user.last_login_at = datetime.utcnow()
-        db.commit()
+async def bulk_update_last_login(db: AsyncSession, logins: dict[uuid.UUID, datetime]) -> None:
+    """
+    Apply many login timestamps in one UPDATE ... FROM (VALUES ...) statement
+    GREATEST keeps the newest value when several workers flush the same user
+    """
+    if not logins:
+        return
+    rows = values(
+        column("id", UUID(as_uuid=True)),
+        column("last_login_at", DateTime(timezone=True)),
+        name="logins"
+    ).data(list(logins.items()))
+    stmt = (
+        update(User)
+        .where(User.id == rows.c.id)
+        .values(last_login_at=func.greatest(User.last_login_at, rows.c.last_login_at))
+    )
+    await db.execute(stmt, execution_options={"synchronize_session": False})
+    await db.commit()
+
+
+async def get_session_states(db: AsyncSession, changed_since: Optional[datetime] = None) -> list:
+    """
+    Rows of (id, username, session_version, is_active, changed_at) for token checks,
+    limited to users created or updated at or after changed_since when given
+    """
+    changed_at = func.coalesce(User.updated_at, User.created_at)
+    stmt = select(User.id, User.username, User.session_version, User.is_active, changed_at.label("changed_at"))
+    if changed_since is not None:
+        stmt = stmt.where(changed_at >= changed_since)
+    result = await db.execute(stmt)
+    return result.all()
+
 
+async def bump_session_version(db: AsyncSession, db_user: User) -> None:
+    """Invalidate every access and refresh token issued to a user so far"""
+    db_user.session_version = db_user.session_version + 1
+    await db.commit()
 
 
+async def update_password_hash(db: AsyncSession, db_user: User, password_hash: str) -> None:
+    """Replace a user's stored password hash"""
+    db_user.password_hash = password_hash
+    await db.commit()
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    """Authenticate a user"""
-    user = get_user_by_username(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    """
+    Authenticate a user, verifying the password on the dedicated bcrypt pool
+    A hash made with outdated settings (e.g. fewer BCRYPT_ROUNDS) is replaced transparently
+    """
+    user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash is not None:
+        await update_password_hash(db, user, new_hash)
     return user
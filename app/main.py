@@ -1,15 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.database import async_engine, replica_engine
+from app.core import metrics
+from app.core.imaging import shutdown_image_executor
+from app.core.last_login import start_last_login_flusher, stop_last_login_flusher
+from app.core.passwords import shutdown_password_executor
+from app.core.replica import WriteTokenMiddleware, start_replica_monitor, stop_replica_monitor
+from app.core.session_registry import start_session_registry, stop_session_registry
+from app.core.uploads import UploadSizeLimitMiddleware
 from app.api.routes import api_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop process-wide background resources"""
+    last_login_flusher = start_last_login_flusher()
+    session_refresher = start_session_registry()
+    replica_checker = start_replica_monitor()
+    yield
+    await stop_replica_monitor(replica_checker)
+    await stop_session_registry(session_refresher)
+    await stop_last_login_flusher(last_login_flusher)
+    shutdown_image_executor()
+    shutdown_password_executor()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
     description=settings.APP_DESCRIPTION,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -19,8 +47,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Write-Token", "X-Total-Count", "X-Count-Source"],
 )
 
+# Reject oversized uploads from Content-Length before the body is read
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Tell clients when they wrote, so their next reads avoid a lagging replica
+app.add_middleware(WriteTokenMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -42,4 +77,10 @@ def health_check():
         "status": "healthy",
         "app": settings.APP_NAME,
         "version": settings.APP_VERSION
-    }
\ No newline at end of file
+    }
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """In-process counters and gauges for this worker"""
+    return metrics.snapshot()
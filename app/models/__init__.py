@@ -6,7 +6,11 @@ from app.models.user import User
 from app.models.location import Location
 from app.models.category import Category
 from app.models.invoice import Invoice
+from app.models.invoice_count import InvoiceCount
+from app.models.invoice_daily_stat import InvoiceDailyStat, RollupWatermark
 from app.models.invoice_image import InvoiceImage
+from app.models.image_blob import ImageBlob
+from app.models.upload_session import UploadSession
 
 __all__ = [
     'Base',
@@ -14,5 +18,10 @@ __all__ = [
     'Location',
     'Category',
     'Invoice',
+    'InvoiceCount',
+    'InvoiceDailyStat',
+    'RollupWatermark',
     'InvoiceImage',
+    'ImageBlob',
+    'UploadSession',
 ]
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, Index, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ImageBlob(Base):
+    """Content-addressed image file shared by every InvoiceImage with the same bytes"""
+    
+    __tablename__ = "image_blobs"
+    __table_args__ = (
+        # cleanup_uploads only looks at the few unreferenced blobs
+        Index('ix_image_blobs_unreferenced', 'last_used_at', postgresql_where=text('ref_count <= 0')),
+    )
+    
+    sha256 = Column(String(64), primary_key=True)  # Hex SHA-256 of the file content
+    file_path = Column(Text, nullable=False)  # Sharded path: blobs/ab/cd/<sha256>
+    file_size = Column(BigInteger, nullable=False)
+    mime_type = Column(String(50))
+    ref_count = Column(Integer, nullable=False, default=0)  # Number of InvoiceImage rows pointing here
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Touched whenever an upload is about to use the blob; cleanup_uploads leaves
+    # unreferenced blobs alone until BLOB_GC_GRACE_SECONDS after this
+    last_used_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ImageBlob(sha256='{self.sha256}', ref_count={self.ref_count})>"
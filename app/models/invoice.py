@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,6 +10,30 @@ class Invoice(Base):
     """Invoice model for photo capture sessions"""
     
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Keyset pagination: newest first, optionally within one user or location
+        Index('ix_invoices_captured_at_id', 'captured_at', 'id'),
+        Index('ix_invoices_user_id_captured_at_id', 'user_id', 'captured_at', 'id'),
+        Index('ix_invoices_location_id_captured_at_id', 'location_id', 'captured_at', 'id'),
+        # Filter combinations issued by get_invoices and the mobile draft list
+        Index('ix_invoices_location_id_status_captured_at_id', 'location_id', 'status', 'captured_at', 'id'),
+        Index('ix_invoices_status_captured_at_id', 'status', 'captured_at', 'id'),
+        Index('ix_invoices_category_id_captured_at_id', 'category_id', 'captured_at', 'id'),
+        Index(
+            'ix_invoices_user_id_captured_at_id_draft', 'user_id', 'captured_at', 'id',
+            postgresql_where=text("status = 'draft'")
+        ),
+        # Change feed for the daily stats rollup; inserts only set created_at
+        Index('ix_invoices_changed_at', func.coalesce(text('updated_at'), text('created_at'))),
+        # meta filters: containment, and top-level key existence (jsonb_path_ops cannot index ?)
+        Index(
+            'ix_invoices_extra_metadata', 'extra_metadata',
+            postgresql_using='gin', postgresql_ops={'extra_metadata': 'jsonb_path_ops'}
+        ),
+        Index('ix_invoices_meta_keys', func.invoice_meta_keys(text('extra_metadata')), postgresql_using='gin'),
+        # Monthly partitions, managed by scripts/manage_partitions.py
+        {'postgresql_partition_by': 'RANGE (captured_at)'},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -20,7 +44,8 @@ class Invoice(Base):
     note = Column(Text)
     extra_metadata = Column(JSONB, default={})  # Additional metadata like "Biên bản", "KTSSS"
     
-    captured_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key, so part of the primary key
+    captured_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
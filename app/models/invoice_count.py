@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+# Stands in for NULL in the unique key, so invoices without a location or category are counted too
+NO_LOCATION = '00000000-0000-0000-0000-000000000000'
+NO_CATEGORY = 0
+
+
+class InvoiceCount(Base):
+    """
+    Number of invoices per (location, category, status)
+    Maintained by triggers on invoices, so facet counts never scan the invoices table
+    """
+    
+    __tablename__ = "invoice_counts"
+    __table_args__ = (
+        Index(
+            'ux_invoice_counts_key',
+            func.coalesce(text('location_id'), text(f"'{NO_LOCATION}'::uuid")),
+            func.coalesce(text('category_id'), text(str(NO_CATEGORY))),
+            'status',
+            unique=True
+        ),
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    location_id = Column(UUID(as_uuid=True), index=True)  # Counts are usually read for one location
+    category_id = Column(Integer)
+    status = Column(String(20), nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<InvoiceCount(location_id='{self.location_id}', category_id={self.category_id}, status='{self.status}', count={self.count})>"
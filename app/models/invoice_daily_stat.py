@@ -0,0 +1,47 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.models.invoice_count import NO_CATEGORY, NO_LOCATION
+
+
+class InvoiceDailyStat(Base):
+    """
+    Invoice, image and byte totals per (day, user, location, category, status)
+    Rebuilt per (day, user) by scripts/refresh_daily_stats.py from rows changed since
+    the last run, so reports never read invoices or invoice_images
+    """
+    
+    __tablename__ = "invoice_daily_stats"
+    __table_args__ = (
+        Index(
+            'ux_invoice_daily_stats_key',
+            'day',
+            'user_id',
+            func.coalesce(text('location_id'), text(f"'{NO_LOCATION}'::uuid")),
+            func.coalesce(text('category_id'), text(str(NO_CATEGORY))),
+            func.coalesce(text('status'), text("''")),
+            unique=True
+        ),
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)  # captured_at in REPORTING_TIMEZONE
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    location_id = Column(UUID(as_uuid=True))
+    category_id = Column(Integer)
+    status = Column(String(20))
+    invoices = Column(BigInteger, nullable=False, default=0)
+    images = Column(BigInteger, nullable=False, default=0)
+    image_bytes = Column(BigInteger, nullable=False, default=0)  # Sum of invoice_images.file_size
+    
+    def __repr__(self):
+        return f"<InvoiceDailyStat(day='{self.day}', user_id='{self.user_id}', invoices={self.invoices})>"
+
+
+class RollupWatermark(Base):
+    """How far each incremental rollup has processed changes"""
+    
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, ForeignKeyConstraint, Integer, Numeric
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,20 +10,37 @@ class InvoiceImage(Base):
     """Invoice image model for captured photos"""
     
     __tablename__ = "invoice_images"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['invoice_id', 'invoice_captured_at'], ['invoices.id', 'invoices.captured_at'], ondelete='CASCADE'
+        ),
+        # Partitioned like invoices, so a month of images is dropped with its invoices
+        {'postgresql_partition_by': 'RANGE (invoice_captured_at)'},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    invoice_id = Column(UUID(as_uuid=True), ForeignKey('invoices.id', ondelete='CASCADE'), nullable=False)
+    invoice_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    invoice_captured_at = Column(DateTime(timezone=True), primary_key=True)  # Partition key, copied from the invoice
     
     file_path = Column(Text, nullable=False)  # S3/MinIO path
+    content_sha256 = Column(String(64), ForeignKey('image_blobs.sha256'), index=True)  # Shared blob, if content-addressed
     file_name = Column(String(255))
     file_size = Column(Integer)  # Size in bytes
+    original_file_size = Column(Integer)  # Size as uploaded, before ingest normalization
     mime_type = Column(String(50))  # image/jpeg, image/png
+    width = Column(Integer)  # Pixels as displayed, after EXIF orientation
+    height = Column(Integer)
     
     # GPS coordinates from photo capture
     gps_latitude = Column(Numeric(9, 6))
     gps_longitude = Column(Numeric(9, 6))
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Metadata read from the photo's own EXIF header
+    exif_gps_latitude = Column(Numeric(9, 6))
+    exif_gps_longitude = Column(Numeric(9, 6))
+    taken_at = Column(DateTime(timezone=True), index=True)  # EXIF DateTimeOriginal
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Change feed for the daily stats rollup
     
     # Relationships
     invoice = relationship("Invoice", back_populates="images")
@@ -0,0 +1,32 @@
+import uuid
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UploadSession(Base):
+    """Resumable upload session for an invoice photo sent in byte ranges"""
+    
+    __tablename__ = "upload_sessions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    # Invoice fields applied when the upload is finalized
+    category_id = Column(Integer, ForeignKey('categories.id'))
+    note = Column(Text)
+    invoice_status = Column(String(20), default='draft')
+    
+    file_name = Column(String(255))
+    mime_type = Column(String(50))
+    upload_length = Column(BigInteger, nullable=False)  # Total size announced by the client
+    upload_offset = Column(BigInteger, nullable=False, default=0)  # Bytes received so far
+    temp_path = Column(Text, nullable=False)  # Partial file on shared upload storage
+    
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<UploadSession(id='{self.id}', offset={self.upload_offset}/{self.upload_length})>"
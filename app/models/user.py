@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -19,6 +19,7 @@ class User(Base):
     avatar_url = Column(Text)
     role = Column(String(20), default='staff')  # admin, staff
     is_active = Column(Boolean, default=True)
+    session_version = Column(Integer, nullable=False, default=1, server_default='1')  # Bumped to revoke all tokens
     last_login_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
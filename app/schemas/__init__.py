@@ -1,33 +1,44 @@
 """
 Pydantic schemas for request/response validation
 """
-from app.schemas.user import UserBase, UserCreate, UserResponse, UserLogin
+from app.schemas.user import UserBase, UserCreate, UserImport, UserResponse, UserLogin
 from app.schemas.token import Token, TokenData, RefreshTokenRequest
-from app.schemas.location import LocationBase, LocationCreate, LocationResponse
-from app.schemas.category import CategoryBase, CategoryCreate, CategoryResponse
+from app.schemas.location import LocationBase, LocationCreate, LocationImport, LocationResponse
+from app.schemas.category import CategoryBase, CategoryCreate, CategoryImport, CategoryResponse
 from app.schemas.invoice import (
     InvoiceStatus,
     InvoiceBase,
     InvoiceCreate,
     InvoiceResponse,
-    InvoiceWithImages
+    InvoiceWithImages,
+    InvoiceListItem,
+    InvoiceCounts
 )
 from app.schemas.invoice_image import (
     InvoiceImageBase,
     InvoiceImageCreate,
     InvoiceImageResponse
 )
+from app.schemas.upload_session import UploadSessionCreate, UploadSessionResponse
+from app.schemas.bulk_import import ImportRowError, ImportResult
+from app.schemas.report import DailyStatsRow
 
 __all__ = [
     # User
-    'UserBase', 'UserCreate', 'UserResponse', 'UserLogin',
+    'UserBase', 'UserCreate', 'UserImport', 'UserResponse', 'UserLogin',
     # Location
-    'LocationBase', 'LocationCreate', 'LocationResponse',
+    'LocationBase', 'LocationCreate', 'LocationImport', 'LocationResponse',
     # Category
-    'CategoryBase', 'CategoryCreate', 'CategoryResponse',
+    'CategoryBase', 'CategoryCreate', 'CategoryImport', 'CategoryResponse',
     # Invoice
     'InvoiceStatus', 'InvoiceBase', 'InvoiceCreate',
-    'InvoiceResponse', 'InvoiceWithImages',
+    'InvoiceResponse', 'InvoiceWithImages', 'InvoiceListItem', 'InvoiceCounts',
     # Invoice Image
     'InvoiceImageBase', 'InvoiceImageCreate', 'InvoiceImageResponse',
+    # Upload Session
+    'UploadSessionCreate', 'UploadSessionResponse',
+    # Bulk import
+    'ImportRowError', 'ImportResult',
+    # Reports
+    'DailyStatsRow',
 ]
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class ImportRowError(BaseModel):
+    """Why one input row was not imported"""
+    line: int
+    errors: list[str]
+
+
+class ImportResult(BaseModel):
+    """Summary of a bulk import"""
+    processed: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: list[ImportRowError]
+    
+    model_config = ConfigDict(from_attributes=True)
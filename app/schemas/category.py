@@ -15,6 +15,11 @@ class CategoryCreate(CategoryBase):
     is_active: bool = True
 
 
+class CategoryImport(CategoryCreate):
+    """One row of a bulk category import; rows are matched on code"""
+    code: str = Field(..., min_length=1, max_length=50)
+
+
 
 
 
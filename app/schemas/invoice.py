@@ -1,11 +1,12 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 import uuid
 
-if TYPE_CHECKING:
-    from app.schemas.invoice_image import InvoiceImageResponse
+from app.schemas.category import CategoryResponse
+from app.schemas.invoice_image import InvoiceImageResponse
+from app.schemas.location import LocationResponse
 
 
 class InvoiceStatus(str, Enum):
@@ -45,7 +46,36 @@ class InvoiceResponse(InvoiceBase):
 
 class InvoiceWithImages(InvoiceResponse):
     """Schema for invoice with images"""
-    images: list = Field(default_factory=list)
+    images: list[InvoiceImageResponse] = Field(default_factory=list)
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StatusCount(BaseModel):
+    """Invoices with one status"""
+    status: Optional[str] = None
+    count: int
+
+
+class CategoryCount(BaseModel):
+    """Invoices in one category (null for uncategorized)"""
+    category_id: Optional[int] = None
+    count: int
+
+
+class InvoiceCounts(BaseModel):
+    """Facet counts for an invoice listing; source tells whether they are exact or estimated"""
+    total: int
+    source: str  # exact, counter or estimate
+    by_status: list[StatusCount]
+    by_category: list[CategoryCount]
+
+
+class InvoiceListItem(InvoiceResponse):
+    """Schema for invoice list rows; related objects are present only when requested with include"""
+    images: Optional[list[InvoiceImageResponse]] = None
+    location: Optional[LocationResponse] = None
+    category: Optional[CategoryResponse] = None
     
     model_config = ConfigDict(from_attributes=True)
 
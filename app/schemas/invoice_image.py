@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, computed_field
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
@@ -8,11 +8,18 @@ import uuid
 class InvoiceImageBase(BaseModel):
     """Base invoice image schema"""
     file_path: str
+    content_sha256: Optional[str] = Field(None, max_length=64)
     file_name: Optional[str] = Field(None, max_length=255)
     file_size: Optional[int] = None
+    original_file_size: Optional[int] = None
     mime_type: Optional[str] = Field(None, max_length=50)
+    width: Optional[int] = None
+    height: Optional[int] = None
     gps_latitude: Optional[Decimal] = None
     gps_longitude: Optional[Decimal] = None
+    exif_gps_latitude: Optional[Decimal] = None
+    exif_gps_longitude: Optional[Decimal] = None
+    taken_at: Optional[datetime] = None
 
 
 class InvoiceImageCreate(InvoiceImageBase):
@@ -27,3 +34,9 @@ class InvoiceImageResponse(InvoiceImageBase):
     created_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
+    
+    @computed_field
+    @property
+    def url(self) -> str:
+        """API path that serves the image bytes"""
+        return f"/api/v1/images/{self.id}"
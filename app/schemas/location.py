@@ -18,6 +18,11 @@ class LocationCreate(LocationBase):
     pass
 
 
+class LocationImport(LocationBase):
+    """One row of a bulk location import; rows are matched on code"""
+    code: str = Field(..., min_length=1, max_length=50)
+
+
 
 
 
@@ -0,0 +1,17 @@
+from datetime import date
+from typing import Optional
+import uuid
+
+from pydantic import BaseModel
+
+
+class DailyStatsRow(BaseModel):
+    """Totals for one group of a daily report; only the grouped-by fields are set"""
+    day: Optional[date] = None
+    location_id: Optional[uuid.UUID] = None
+    category_id: Optional[int] = None
+    user_id: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+    invoices: int
+    images: int
+    image_bytes: int
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional
+from datetime import datetime
+import uuid
+
+from app.schemas.invoice import InvoiceStatus
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable upload"""
+    upload_length: int = Field(..., gt=0)
+    file_name: Optional[str] = Field(None, max_length=255)
+    mime_type: Optional[str] = Field(None, max_length=50)
+    category_id: Optional[int] = None
+    note: Optional[str] = None
+    status: InvoiceStatus = InvoiceStatus.DRAFT
+
+
+class UploadSessionResponse(BaseModel):
+    """Schema for resumable upload session responses"""
+    id: uuid.UUID
+    file_name: Optional[str] = None
+    mime_type: Optional[str] = None
+    upload_length: int
+    upload_offset: int
+    expires_at: datetime
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
@@ -19,6 +19,17 @@ class UserCreate(UserBase):
     location_id: uuid.UUID
 
 
+class UserImport(UserBase):
+    """
+    One row of a bulk user import; rows are matched on username
+    New users need a password or an existing bcrypt password_hash; supplying the hash
+    avoids hashing every row, which is by far the slowest part of an import
+    """
+    password: Optional[str] = Field(None, min_length=8)
+    password_hash: Optional[str] = Field(None, max_length=255)
+    location_code: Optional[str] = Field(None, max_length=50)
+
+
 
 
 
@@ -46,6 +57,7 @@ class UserLogin(BaseModel):
 __all__ = [
     'UserBase',
     'UserCreate',
+    'UserImport',
     'UserResponse',
     'UserLogin',
     'Token',
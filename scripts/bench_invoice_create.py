@@ -0,0 +1,113 @@
+"""
+Benchmark DB round trips per invoice upload
+Compares the legacy create_invoice + add_invoice_image path with the
+single-transaction create_invoice_with_images path against the configured database
+"""
+import sys
+import os
+import asyncio
+import time
+import uuid
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import invoice as invoice_crud
+from app.models.location import Location
+from app.models.user import User
+from app.schemas.invoice import InvoiceCreate
+
+ITERATIONS = 50
+
+
+class RoundTripCounter:
+    """Count statements, commits and rollbacks sent to the database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_event(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        # Engine events fire on the sync engine that the async engine wraps
+        engine = async_engine.sync_engine
+        event.listen(engine, "before_cursor_execute", self._on_event)
+        event.listen(engine, "commit", self._on_event)
+        event.listen(engine, "rollback", self._on_event)
+        return self
+
+    def __exit__(self, *exc):
+        engine = async_engine.sync_engine
+        event.remove(engine, "before_cursor_execute", self._on_event)
+        event.remove(engine, "commit", self._on_event)
+        event.remove(engine, "rollback", self._on_event)
+
+
+def _image_row() -> dict:
+    return {
+        "file_path": f"uploads/bench/{uuid.uuid4()}.jpg",
+        "file_name": "bench.jpg",
+        "file_size": 1024,
+        "mime_type": "image/jpeg",
+    }
+
+
+async def legacy_upload(db, invoice_data, user_id):
+    """The original per-step commit + refresh flow"""
+    db_invoice = await invoice_crud.create_invoice(db=db, invoice=invoice_data, user_id=user_id)
+    await invoice_crud.add_invoice_image(
+        db=db, invoice_id=db_invoice.id, invoice_captured_at=db_invoice.captured_at, **_image_row()
+    )
+    await db.refresh(db_invoice)
+    await db.refresh(db_invoice, ["images"])
+    return list(db_invoice.images)
+
+
+async def unit_of_work_upload(db, invoice_data, user_id):
+    """The single-transaction RETURNING flow"""
+    db_invoice = await invoice_crud.create_invoice_with_images(
+        db=db, invoice=invoice_data, user_id=user_id, images=[_image_row()]
+    )
+    return list(db_invoice.images)
+
+
+async def run(name, upload_fn, db, invoice_data, user_id):
+    with RoundTripCounter() as counter:
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            await upload_fn(db, invoice_data, user_id)
+        elapsed = time.perf_counter() - started
+    print(f"{name:<16} {counter.count / ITERATIONS:>6.1f} round trips/upload  {elapsed / ITERATIONS * 1000:>7.2f} ms/upload")
+
+
+async def main():
+    db = AsyncSessionLocal()
+    location = Location(name="Benchmark Store", code=f"BENCH_{uuid.uuid4().hex[:8]}")
+    user = User(
+        username=f"bench_{uuid.uuid4().hex[:8]}",
+        email=f"bench_{uuid.uuid4().hex[:8]}@example.com",
+        password_hash="!",
+        location=location
+    )
+    db.add_all([location, user])
+    await db.commit()
+
+    invoice_data = InvoiceCreate(location_id=location.id, note="benchmark")
+    try:
+        await run("legacy", legacy_upload, db, invoice_data, user.id)
+        await run("unit-of-work", unit_of_work_upload, db, invoice_data, user.id)
+    finally:
+        # Invoices and images cascade from the user (ON DELETE CASCADE)
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.execute(delete(Location).where(Location.id == location.id))
+        await db.commit()
+        await db.close()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Regression check for EXIF parsing in the image probe
+Builds small JPEG headers with crafted EXIF capture offsets and GPS values and exits
+non-zero if any of them is parsed wrongly or makes the probe raise. Needs no database.
+
+    python scripts/check_image_probe.py
+"""
+import sys
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import image_probe
+
+DEFAULT_TZ = timezone(timedelta(hours=7))
+
+# TIFF field types
+ASCII, LONG, RATIONAL = 2, 4, 5
+
+
+def _ifd(entries: list[tuple[int, int, int, bytes]], start: int) -> bytes:
+    """Little-endian IFD at offset start; values over 4 bytes go right after it"""
+    data_offset = start + 2 + 12 * len(entries) + 4
+    table, data = b"", b""
+    for tag, field_type, count, value in entries:
+        if len(value) <= 4:
+            table += struct.pack("<HHI", tag, field_type, count) + value.ljust(4, b"\0")
+        else:
+            table += struct.pack("<HHII", tag, field_type, count, data_offset + len(data))
+            data += value
+    return struct.pack("<H", len(entries)) + table + struct.pack("<I", 0) + data
+
+
+def _ascii(text: str) -> tuple[int, bytes]:
+    value = text.encode() + b"\0"
+    return len(value), value
+
+
+def _degrees(value: float) -> bytes:
+    """Degrees/minutes/seconds as three rationals, all in the degrees"""
+    return struct.pack("<IIIIII", round(value * 1000), 1000, 0, 1, 0, 1)
+
+
+def jpeg(
+    offset_time: Optional[str] = None,
+    latitude: Optional[tuple[float, str]] = None,
+    longitude: Optional[tuple[float, str]] = None
+) -> bytes:
+    """A JPEG header with an EXIF capture time (and offset) and optional GPS, then a 640x480 frame"""
+    exif_entries = [(image_probe.TAG_DATETIME_ORIGINAL, ASCII, *_ascii("2026:10:18 09:30:00"))]
+    if offset_time is not None:
+        exif_entries.append((image_probe.TAG_OFFSET_TIME_ORIGINAL, ASCII, *_ascii(offset_time)))
+    gps_entries = []
+    if latitude is not None:
+        gps_entries += [
+            (image_probe.TAG_GPS_LATITUDE_REF, ASCII, *_ascii(latitude[1])),
+            (image_probe.TAG_GPS_LATITUDE, RATIONAL, 3, _degrees(latitude[0])),
+        ]
+    if longitude is not None:
+        gps_entries += [
+            (image_probe.TAG_GPS_LONGITUDE_REF, ASCII, *_ascii(longitude[1])),
+            (image_probe.TAG_GPS_LONGITUDE, RATIONAL, 3, _degrees(longitude[0])),
+        ]
+
+    # IFD0 points at the EXIF and GPS IFDs laid out right after it
+    pointers = 2 if gps_entries else 1
+    exif_start = 8 + 2 + 12 * pointers + 4
+    exif_ifd = _ifd(exif_entries, exif_start)
+    gps_start = exif_start + len(exif_ifd)
+    ifd0_entries = [(image_probe.TAG_EXIF_IFD, LONG, 1, struct.pack("<I", exif_start))]
+    if gps_entries:
+        ifd0_entries.append((image_probe.TAG_GPS_IFD, LONG, 1, struct.pack("<I", gps_start)))
+    tiff = b"II*\0" + struct.pack("<I", 8) + _ifd(ifd0_entries, 8) + exif_ifd
+    if gps_entries:
+        tiff += _ifd(gps_entries, gps_start)
+
+    app1 = b"Exif\0\0" + tiff
+    sof = struct.pack(">BHHB", 8, 480, 640, 3) + b"\x01\x11\x00" * 3
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+        + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof
+    )
+
+
+def taken_at(offset: timedelta) -> datetime:
+    return datetime(2026, 10, 18, 9, 30, tzinfo=timezone(offset))
+
+
+# (description, header, expected probe fields)
+CASES = [
+    ("offset +07:00", jpeg("+07:00"), {"taken_at": taken_at(timedelta(hours=7))}),
+    ("offset -03:30", jpeg("-03:30"), {"taken_at": taken_at(-timedelta(hours=3, minutes=30))}),
+    ("offset +99:00 falls back", jpeg("+99:00"), {"taken_at": taken_at(timedelta(hours=7))}),
+    ("offset +05:75 falls back", jpeg("+05:75"), {"taken_at": taken_at(timedelta(hours=7))}),
+    ("offset garbage falls back", jpeg("+ab:cd"), {"taken_at": taken_at(timedelta(hours=7))}),
+    (
+        "GPS in range",
+        jpeg(latitude=(10.5, "N"), longitude=(106.75, "W")),
+        {"gps_latitude": 10.5, "gps_longitude": -106.75},
+    ),
+    (
+        "GPS out of range",
+        jpeg(latitude=(95.0, "N"), longitude=(181.0, "E")),
+        {"gps_latitude": None, "gps_longitude": None},
+    ),
+    (
+        "GPS ref of the wrong axis",
+        jpeg(latitude=(10.5, "E"), longitude=(106.75, "X")),
+        {"gps_latitude": None, "gps_longitude": None},
+    ),
+]
+
+
+def main() -> int:
+    failures = []
+    for label, head, expected in CASES:
+        try:
+            probe = image_probe.probe_image(head, default_tz=DEFAULT_TZ)
+            problems = [
+                f"{field}: {getattr(probe, field)!r}, expected {value!r}"
+                for field, value in expected.items() if getattr(probe, field) != value
+            ]
+            if (probe.width, probe.height) != (640, 480):
+                problems.append(f"size: {probe.width}x{probe.height}, expected 640x480")
+        except Exception as e:
+            problems = [f"raised {e!r}"]
+        print(f"{'FAIL' if problems else 'ok  '}  {label}")
+        if problems:
+            failures.append((label, problems))
+
+    if failures:
+        print(f"\n✗ {len(failures)} probe checks failed:")
+        for label, problems in failures:
+            print(f"  {label}: {'; '.join(problems)}")
+        return 1
+    print(f"\n✓ All {len(CASES)} probe checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Query-count regression check for invoice listing with include
+Seeds a page worth of invoices with several images each inside a transaction, loads
+one page for every include combination through get_invoices, and exits non-zero if a
+page takes more statements than expected (i.e. something is loaded per row), or if
+the facet counts for an extra_metadata filter are wrong.
+Everything is rolled back at the end.
+
+    python scripts/check_invoice_list_queries.py [--page-size 100]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import itertools
+from datetime import datetime, timezone
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import invoice as invoice_crud
+from app.crud import invoice_count as invoice_count_crud
+from app.crud import partition as partition_crud
+from app.schemas.invoice import InvoiceListItem
+
+IMAGES_PER_INVOICE = 3
+
+SEED_SQL = [
+    """
+    INSERT INTO locations (id, name, code)
+    VALUES (gen_random_uuid(), 'Query check', 'query-check')
+    """,
+    """
+    INSERT INTO categories (name, code, is_active)
+    VALUES ('Query check', 'query-check', true)
+    """,
+    """
+    INSERT INTO users (id, username, email, password_hash, role, is_active, location_id)
+    SELECT gen_random_uuid(), 'query-check', 'query-check@example.invalid', '-', 'staff', true, id
+    FROM locations WHERE code = 'query-check'
+    """,
+    """
+    INSERT INTO invoices (id, user_id, location_id, category_id, status, extra_metadata, captured_at, created_at)
+    SELECT gen_random_uuid(), u.id, u.location_id, c.id, 'draft',
+           CASE WHEN n % 2 = 0 THEN '{"KTSSS": true}' ELSE '{}' END::jsonb,
+           now() - n * interval '1 minute', now() - n * interval '1 minute'
+    FROM generate_series(1, :invoices) AS n
+    JOIN users u ON u.username = 'query-check'
+    JOIN categories c ON c.code = 'query-check'
+    """,
+    """
+    INSERT INTO invoice_images (id, invoice_id, invoice_captured_at, file_path, file_name, file_size, mime_type)
+    SELECT gen_random_uuid(), i.id, i.captured_at, 'query-check/' || i.id || '-' || n || '.jpg', 'query-check.jpg', 1024, 'image/jpeg'
+    FROM invoices i
+    JOIN users u ON u.id = i.user_id AND u.username = 'query-check'
+    CROSS JOIN generate_series(1, :images) AS n
+    """,
+]
+
+
+def expected_statements(include: tuple[str, ...]) -> int:
+    """The page query, plus one SELECT ... IN for images; location and category are joined"""
+    return 1 + ("images" in include)
+
+
+class StatementCounter:
+    """Count statements sent to the database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+async def run_checks(db, user_id, page_size: int) -> list[str]:
+    """Load one page per include combination and return descriptions of failures"""
+    names = list(invoice_crud.INVOICE_INCLUDES)
+    failures = []
+    for size in range(len(names) + 1):
+        for include in itertools.combinations(names, size):
+            db.expunge_all()
+            with StatementCounter() as counter:
+                invoices = await invoice_crud.get_invoices(db, limit=page_size, user_id=user_id, include=include)
+                # Serialize what the route would, so a missed eager load fails here
+                for invoice in invoices:
+                    InvoiceListItem.model_validate({
+                        **{name: getattr(invoice, name) for name in include},
+                        **{column: getattr(invoice, column) for column in InvoiceListItem.model_fields
+                           if column not in names},
+                    })
+            expected = expected_statements(include)
+            label = "include=" + (",".join(include) or "(none)")
+            ok = counter.count <= expected and len(invoices) == page_size
+            print(f"{'ok  ' if ok else 'FAIL'}  {label:<40} {counter.count} statements for {len(invoices)} rows")
+            if not ok:
+                failures.append(f"{label}: {counter.count} statements, expected at most {expected}")
+    return failures
+
+
+async def check_meta_counts(db, user_id, invoices: int) -> list[str]:
+    """Count through the planner estimate with a JSON object meta filter, which has bound JSONB parameters"""
+    counts = await invoice_count_crud.get_invoice_counts(db, user_id=user_id, meta_contains={"KTSSS": True})
+    expected = invoices // 2
+    ok = counts["total"] == expected
+    print(f"{'ok  ' if ok else 'FAIL'}  counts meta_contains={{KTSSS: true}}: {counts['total']} ({counts['source']})")
+    return [] if ok else [f"meta_contains counts: {counts['total']}, expected {expected}"]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                # Seeded invoices reach back a couple of hours, possibly into last month
+                this_month = partition_crud.month_start(datetime.now(timezone.utc).date())
+                for month in (partition_crud.add_months(this_month, -1), this_month):
+                    for table in partition_crud.PARTITIONED_TABLES:
+                        await db.execute(text(partition_crud.partition_ddl(table, month)))
+                params = {"invoices": args.page_size + 10, "images": IMAGES_PER_INVOICE}
+                for statement in SEED_SQL:
+                    await db.execute(text(statement), {k: v for k, v in params.items() if f":{k}" in statement})
+                user_id = (await db.execute(text("SELECT id FROM users WHERE username = 'query-check'"))).scalar_one()
+                failures = await run_checks(db, user_id, args.page_size)
+                failures += await check_meta_counts(db, user_id, params["invoices"])
+            finally:
+                await db.rollback()
+    finally:
+        await async_engine.dispose()
+
+    if failures:
+        print(f"\n✗ {len(failures)} checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print(f"\n✓ Every include combination loads a page of {args.page_size} in a fixed number of statements")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,237 @@
+"""
+Query-plan regression check for invoice listing
+Seeds a large synthetic dataset inside a transaction, EXPLAINs every get_invoices
+filter combination (first page and cursor page), extra_metadata filters and image
+lookups, and exits
+non-zero if any plan reads invoices or invoice_images with a sequential scan, or
+a cursor page reads partitions newer than its cursor.
+Everything is rolled back at the end, but run it against a scratch database:
+the seed takes row locks and bloats the tables until VACUUM.
+
+    python scripts/check_query_plans.py [--invoices 200000]
+"""
+import sys
+import os
+import argparse
+import itertools
+import re
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text
+
+from app.core.database import SessionLocal
+from app.core.query_plan import Explain, root_plan
+from app.crud import invoice as invoice_crud
+from app.crud import partition as partition_crud
+from app.models.invoice_image import InvoiceImage
+
+CHECKED_TABLES = {"invoices", "invoice_images"}
+
+PARTITION = re.compile(r"^(invoices|invoice_images)_p(\d{4})_(\d{2})$")
+
+# Seeded invoices are this far apart, newest now
+SEED_SPACING = timedelta(seconds=37)
+
+SEED_SQL = [
+    """
+    INSERT INTO locations (id, name, code)
+    SELECT gen_random_uuid(), 'Plan check ' || n, 'plan-check-' || n
+    FROM generate_series(1, :locations) AS n
+    """,
+    """
+    INSERT INTO categories (name, code, is_active)
+    SELECT 'Plan check ' || n, 'plan-check-' || n, true
+    FROM generate_series(1, :categories) AS n
+    """,
+    """
+    INSERT INTO users (id, username, email, password_hash, role, is_active, location_id)
+    SELECT gen_random_uuid(), 'plan-check-' || n, 'plan-check-' || n || '@example.invalid', '-', 'staff', true,
+           (SELECT id FROM locations WHERE code = 'plan-check-' || (1 + n % :locations))
+    FROM generate_series(1, :users) AS n
+    """,
+    """
+    INSERT INTO invoices (id, user_id, location_id, category_id, status, extra_metadata, captured_at, created_at)
+    SELECT gen_random_uuid(), u.id, u.location_id, c.id,
+           (ARRAY['draft', 'completed', 'completed', 'completed', 'synced', 'synced', 'synced', 'synced'])[1 + n % 8],
+           CASE WHEN n % 2000 = 0 THEN '{"KTSSS": true}'::jsonb ELSE '{}'::jsonb END, ts, ts
+    FROM generate_series(1, :invoices) AS n
+    CROSS JOIN LATERAL (SELECT now() - (n * interval '37 seconds') AS ts) AS t  -- SEED_SPACING
+    JOIN users u ON u.username = 'plan-check-' || (1 + n % :users)
+    JOIN categories c ON c.code = 'plan-check-' || (1 + n % :categories)
+    """,
+    """
+    INSERT INTO invoice_images (id, invoice_id, invoice_captured_at, file_path, file_name, file_size, mime_type)
+    SELECT gen_random_uuid(), i.id, i.captured_at, 'plan-check/' || i.id || '.jpg', 'plan-check.jpg', 1024, 'image/jpeg'
+    FROM invoices i JOIN users u ON u.id = i.user_id
+    WHERE u.username LIKE 'plan-check-%'
+    """,
+    "ANALYZE locations",
+    "ANALYZE categories",
+    "ANALYZE users",
+    "ANALYZE invoices",
+    "ANALYZE invoice_images",
+]
+
+
+def relations(plan: dict) -> list[tuple[str, str]]:
+    """(node type, relation) for every node reading a table anywhere in a JSON plan tree"""
+    found = []
+    if "Relation Name" in plan:
+        found.append((plan["Node Type"], plan["Relation Name"]))
+    for child in plan.get("Plans", []):
+        found.extend(relations(child))
+    return found
+
+
+def seq_scans(plan: dict, empty: set[str]) -> list[str]:
+    """Checked tables (or their partitions) read by a Seq Scan; scanning an empty partition is free"""
+    found = []
+    for node, relation in relations(plan):
+        match = PARTITION.match(relation)
+        table = match.group(1) if match else relation
+        if node == "Seq Scan" and table in CHECKED_TABLES and relation not in empty:
+            found.append(relation)
+    return found
+
+
+def partitions_after(plan: dict, moment: datetime) -> list[str]:
+    """Partitions read by the plan that only hold rows newer than moment"""
+    found = []
+    for _, relation in relations(plan):
+        match = PARTITION.match(relation)
+        if match and (int(match.group(2)), int(match.group(3))) > (moment.year, moment.month):
+            found.append(relation)
+    return found
+
+
+def index_names(plan: dict) -> set[str]:
+    """Every index a JSON plan tree reads"""
+    found = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= index_names(child)
+    return found
+
+
+def empty_partitions(db) -> set[str]:
+    """Partitions ANALYZE found no rows in"""
+    result = db.execute(text("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND relname ~ '^(invoices|invoice_images)_p[0-9]{4}_[0-9]{2}$' AND reltuples = 0
+    """))
+    return set(result.scalars())
+
+
+def explain(db, stmt) -> dict:
+    """EXPLAIN (FORMAT JSON) a SQLAlchemy statement and return the root plan node"""
+    return root_plan(db.scalar(Explain(stmt)))
+
+
+def sample_values(db) -> dict:
+    """Pick existing filter values from the seeded data"""
+    row = db.execute(text("""
+        SELECT i.user_id, i.location_id, i.category_id, i.captured_at, i.id
+        FROM invoices i JOIN users u ON u.id = i.user_id
+        WHERE u.username = 'plan-check-1'
+        ORDER BY i.captured_at DESC, i.id DESC
+        OFFSET 20 LIMIT 1
+    """)).one()
+    return {
+        "user_id": row.user_id,
+        "location_id": row.location_id,
+        "category_id": row.category_id,
+        "status": "draft",
+        "after": (row.captured_at, row.id),
+    }
+
+
+def run_checks(db) -> list[tuple[str, list[str]]]:
+    """EXPLAIN each query shape and return (description, problems) for failures"""
+    values = sample_values(db)
+    empty = empty_partitions(db)
+    filters = ["user_id", "location_id", "category_id", "status"]
+    failures = []
+
+    for size in range(len(filters) + 1):
+        for combo in itertools.combinations(filters, size):
+            for paged in (False, True):
+                kwargs = {name: values[name] for name in combo}
+                if paged:
+                    kwargs["after"] = values["after"]
+                query = invoice_crud.invoices_query(limit=101, **kwargs)
+                label = "get_invoices(" + ", ".join(list(combo) + (["after"] if paged else [])) + ")"
+                plan = explain(db, query)
+                problems = [f"{relation} seq scan" for relation in seq_scans(plan, empty)]
+                if paged:
+                    # The cursor bound must prune partitions newer than the cursor
+                    problems += [f"{relation} not pruned" for relation in partitions_after(plan, values["after"][0])]
+                print(f"{'FAIL' if problems else 'ok  '}  {label}")
+                if problems:
+                    failures.append((label, problems))
+
+    # A rare tag: walking invoices newest first until 101 match would read the whole table
+    for label, kwargs, index in [
+        ("get_invoices(meta_contains)", {"meta_contains": {"KTSSS": True}}, "_extra_metadata"),
+        ("get_invoices(meta_keys)", {"meta_keys": ["KTSSS"]}, "_meta_keys"),
+    ]:
+        plan = explain(db, invoice_crud.invoices_query(limit=101, **kwargs))
+        problems = [f"{relation} seq scan" for relation in seq_scans(plan, empty)]
+        if not any(name.endswith(index) for name in index_names(plan)):
+            problems.append(f"no *{index} GIN index used")
+        print(f"{'FAIL' if problems else 'ok  '}  {label}")
+        if problems:
+            failures.append((label, problems))
+
+    image_query = select(InvoiceImage).where(InvoiceImage.invoice_id == values["after"][1])
+    problems = [f"{relation} seq scan" for relation in seq_scans(explain(db, image_query), empty)]
+    print(f"{'FAIL' if problems else 'ok  '}  invoice_images by invoice_id")
+    if problems:
+        failures.append(("invoice_images by invoice_id", problems))
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invoices", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = datetime.now(timezone.utc)
+        params = {
+            "invoices": args.invoices,
+            "users": args.users,
+            "locations": args.locations,
+            "categories": args.categories,
+        }
+        # The seed reaches back further than the partitions a fresh database has
+        month = partition_crud.month_start((started - args.invoices * SEED_SPACING).date())
+        while month <= started.date():
+            for table in partition_crud.PARTITIONED_TABLES:
+                db.execute(text(partition_crud.partition_ddl(table, month)))
+            month = partition_crud.add_months(month, 1)
+        for statement in SEED_SQL:
+            db.execute(text(statement), {k: v for k, v in params.items() if f":{k}" in statement})
+        print(f"Seeded {args.invoices} invoices in {(datetime.now(timezone.utc) - started).total_seconds():.1f}s")
+
+        failures = run_checks(db)
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"\n✗ {len(failures)} query plans read more than they should:")
+        for label, problems in failures:
+            print(f"  {label}: {', '.join(sorted(set(problems)))}")
+        return 1
+    print("\n✓ No sequential scans on invoices or invoice_images, and cursor pages skip newer partitions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
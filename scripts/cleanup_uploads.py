@@ -0,0 +1,62 @@
+"""
+Garbage-collect expired resumable upload sessions and unreferenced image blobs
+Run this periodically (e.g. from cron) to remove abandoned partial uploads
+"""
+import sys
+import os
+import asyncio
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.storage import get_storage
+from app.crud import image_blob as image_blob_crud
+from app.crud import upload_session as upload_crud
+
+
+async def cleanup_expired_uploads() -> int:
+    """Delete expired upload sessions and their partial files"""
+    removed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            expired = await upload_crud.get_expired_upload_sessions(db)
+            if not expired:
+                break
+            for upload in expired:
+                temp_path = upload.temp_path
+                await upload_crud.delete_upload_session(db, upload)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                removed += 1
+    return removed
+
+
+async def cleanup_unreferenced_blobs() -> int:
+    """
+    Delete blobs whose reference count dropped to zero, with their stored objects
+    Blobs an upload used within BLOB_GC_GRACE_SECONDS are kept
+    """
+    storage = get_storage()
+    removed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            hashes = await image_blob_crud.get_unreferenced_blob_hashes(db)
+            if not hashes:
+                break
+            for sha256 in hashes:
+                if await image_blob_crud.delete_unreferenced_blob(db, sha256, storage.delete):
+                    removed += 1
+    return removed
+
+
+async def main() -> None:
+    count = await cleanup_expired_uploads()
+    print(f"✓ Removed {count} expired upload sessions")
+    count = await cleanup_unreferenced_blobs()
+    print(f"✓ Removed {count} unreferenced image blobs")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
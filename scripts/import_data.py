@@ -0,0 +1,76 @@
+"""
+Bulk import locations, categories or users from a CSV or NDJSON file
+Rows are COPYed into a staging table and upserted on code (username for users);
+rows that cannot be imported are listed by line at the end.
+
+    python scripts/import_data.py locations stores.csv
+    python scripts/import_data.py users staff.ndjson --errors errors.json
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import time
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.bulk_import import ImportFormatError, detect_format
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import bulk_import as bulk_import_crud
+
+IMPORTERS = {
+    "locations": bulk_import_crud.import_locations,
+    "categories": bulk_import_crud.import_categories,
+    "users": bulk_import_crud.import_users,
+}
+
+
+async def run(kind: str, path: str, fmt: str):
+    """Import one file in a single transaction"""
+    try:
+        async with AsyncSessionLocal() as db:
+            with open(path, "rb") as file:
+                return await IMPORTERS[kind](db, file, fmt)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults from the file extension")
+    parser.add_argument("--errors", help="Write the row errors to this JSON file instead of printing them")
+    args = parser.parse_args()
+
+    try:
+        fmt = detect_format(args.format, args.path, None)
+    except ImportFormatError as e:
+        print(f"✗ {e}")
+        return 2
+
+    started = time.perf_counter()
+    report = asyncio.run(run(args.kind, args.path, fmt))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"✓ {args.kind}: {report.processed} rows in {elapsed:.1f}s, "
+        f"{report.inserted} inserted, {report.updated} updated, {report.failed} failed"
+    )
+    if report.errors:
+        if args.errors:
+            with open(args.errors, "w") as out:
+                json.dump(report.errors, out, ensure_ascii=False, indent=2)
+            print(f"  Row errors written to {args.errors}")
+        else:
+            for error in report.errors:
+                print(f"  line {error['line']}: {'; '.join(error['errors'])}")
+        if report.failed > len(report.errors):
+            print(f"  ... and {report.failed - len(report.errors)} more")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Maintain the monthly partitions of invoices and invoice_images
+Creates the next PARTITION_PREMAKE_MONTHS months, and with INVOICE_RETENTION_MONTHS
+set, expires whole months older than that: detached (kept as plain tables for
+archiving) or, with PARTITION_EXPIRE_ACTION=drop, dropped along with their image
+files. Expiring a month takes a brief lock instead of a long DELETE and leaves no
+dead rows to vacuum. Run it daily from cron; it is safe to re-run.
+
+    python scripts/manage_partitions.py
+    python scripts/manage_partitions.py --dry-run
+"""
+import sys
+import os
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import partition as partition_crud
+
+
+def remove_image_file(path: str) -> bool:
+    """Remove a pre-blob image file, whose file_path is a local path rather than a storage key"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+async def premake(db, this_month, dry_run: bool) -> None:
+    """Create missing partitions from this month through PARTITION_PREMAKE_MONTHS ahead"""
+    existing = set(await partition_crud.get_partition_months(db))
+    for offset in range(settings.PARTITION_PREMAKE_MONTHS + 1):
+        month = partition_crud.add_months(this_month, offset)
+        if month in existing:
+            continue
+        if not dry_run:
+            await partition_crud.create_partitions(db, month)
+        print(f"✓ Created partitions for {month:%Y-%m}")
+
+
+async def expire(db, cutoff, dry_run: bool) -> None:
+    """Detach months before cutoff, then drop detached ones if PARTITION_EXPIRE_ACTION is drop"""
+    for month in await partition_crud.get_partition_months(db):
+        if month >= cutoff:
+            break
+        if not dry_run:
+            await partition_crud.detach_partitions(db, month)
+        print(f"✓ Detached partitions for {month:%Y-%m}")
+
+    if settings.PARTITION_EXPIRE_ACTION != "drop":
+        return
+    for month in await partition_crud.get_detached_months(db):
+        if month >= cutoff:
+            continue
+        removed = 0
+        if not dry_run:
+            # Files first: if this stops halfway the table is still there to resume from
+            after = None
+            while True:
+                paths = await partition_crud.get_unshared_file_paths(db, month, after=after)
+                if not paths:
+                    break
+                removed += sum(remove_image_file(path) for path in paths)
+                after = paths[-1]
+            await db.rollback()
+            await partition_crud.drop_detached_partitions(db, month)
+        print(f"✓ Dropped partitions for {month:%Y-%m} and {removed} image files")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Print what would change without changing it")
+    args = parser.parse_args()
+
+    if settings.PARTITION_EXPIRE_ACTION not in ("detach", "drop"):
+        print(f"✗ PARTITION_EXPIRE_ACTION must be detach or drop, not {settings.PARTITION_EXPIRE_ACTION!r}")
+        return 2
+
+    this_month = partition_crud.month_start(datetime.now(timezone.utc).date())
+    try:
+        async with AsyncSessionLocal() as db:
+            await premake(db, this_month, args.dry_run)
+            if settings.INVOICE_RETENTION_MONTHS:
+                cutoff = partition_crud.add_months(this_month, -settings.INVOICE_RETENTION_MONTHS)
+                await expire(db, cutoff, args.dry_run)
+    finally:
+        await async_engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
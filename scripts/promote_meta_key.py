@@ -0,0 +1,89 @@
+"""
+Promote a frequently filtered extra_metadata key to a generated column with a B-tree index
+The column holds extra_metadata ->> key as text; once META_PROMOTED_KEYS maps the key to
+it, meta filters on that key use the column instead of the GIN index. The index is built
+per partition without blocking writes, but adding a stored generated column rewrites
+invoices under an exclusive lock: run it in a maintenance window.
+
+    python scripts/promote_meta_key.py KTSSS
+    python scripts/promote_meta_key.py "Biên bản" --column meta_bien_ban
+    python scripts/promote_meta_key.py KTSSS --drop
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import re
+import unicodedata
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import async_engine
+from app.crud import partition as partition_crud
+
+COLUMN_NAME = re.compile(r"^[a-z_][a-z0-9_]{0,40}$")
+
+
+def default_column(key: str) -> str:
+    """meta_ plus the key folded to ASCII snake case, e.g. "Biên bản" -> meta_bien_ban"""
+    ascii_key = unicodedata.normalize("NFKD", key.replace("đ", "d").replace("Đ", "D"))
+    ascii_key = ascii_key.encode("ascii", "ignore").decode().lower()
+    return "meta_" + re.sub(r"[^a-z0-9]+", "_", ascii_key).strip("_")
+
+
+async def promote(key: str, column: str) -> None:
+    """Add the generated column and build its index"""
+    literal = key.replace("'", "''")
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        print(f"Adding {column} (rewrites invoices)...")
+        await conn.execute(text(
+            f"ALTER TABLE invoices ADD COLUMN IF NOT EXISTS {column} text "
+            f"GENERATED ALWAYS AS (extra_metadata ->> '{literal}') STORED"
+        ))
+        # Trailing captured_at, id serve the list's newest-first order within one value
+        await partition_crud.create_partitioned_index(
+            conn, "invoices", f"ix_invoices_{column}", f"({column}, captured_at, id)"
+        )
+        await conn.execute(text("ANALYZE invoices"))
+
+
+async def drop(column: str) -> None:
+    """Drop the index and column; remove the key from META_PROMOTED_KEYS first"""
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP INDEX IF EXISTS ix_invoices_{column}"))
+        await conn.execute(text(f"ALTER TABLE invoices DROP COLUMN IF EXISTS {column}"))
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("key", help="Top-level extra_metadata key")
+    parser.add_argument("--column", help="Column name; defaults to meta_ plus the key in snake case")
+    parser.add_argument("--drop", action="store_true", help="Remove a promoted column instead")
+    args = parser.parse_args()
+
+    column = args.column or default_column(args.key)
+    if not COLUMN_NAME.match(column) or not column.startswith("meta_"):
+        print(f"✗ {column!r} is not a usable column name; pass --column meta_<lowercase_name>")
+        return 2
+
+    try:
+        if args.drop:
+            await drop(column)
+            print(f"✓ Dropped {column}")
+            return 0
+        await promote(args.key, column)
+    finally:
+        await async_engine.dispose()
+
+    print(f"✓ Promoted {args.key!r} to invoices.{column}")
+    print(f"  Add it to META_PROMOTED_KEYS, e.g. META_PROMOTED_KEYS='{json.dumps({args.key: column}, ensure_ascii=False)}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
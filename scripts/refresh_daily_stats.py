@@ -0,0 +1,44 @@
+"""
+Refresh the invoice_daily_stats reporting rollup
+Recomputes the (day, user) groups touched since the last run; run it from cron every
+few minutes. Invoices removed by deleting a user are only dropped by a rebuild.
+
+    python scripts/refresh_daily_stats.py
+    python scripts/refresh_daily_stats.py --rebuild-from 2024-01-01
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+from datetime import date
+
+# Add the parent directory to the path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import invoice_stats as invoice_stats_crud
+
+
+async def run(rebuild_from):
+    """Refresh in a single transaction"""
+    try:
+        async with AsyncSessionLocal() as db:
+            return await invoice_stats_crud.refresh_daily_stats(db, rebuild_from=rebuild_from)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild-from", type=date.fromisoformat, help="Recompute every day from this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    groups = asyncio.run(run(args.rebuild_from))
+    print(f"✓ Rebuilt {groups} (day, user) groups in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
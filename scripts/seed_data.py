@@ -8,6 +8,7 @@ import os
 # Add the parent directory to the path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.location import Location
@@ -65,15 +66,9 @@ def seed_locations(db: Session):
     ]
     
     print("Seeding locations...")
-    count = 0
-    for loc_data in locations_data:
-        # Check if location already exists
-        existing = db.query(Location).filter(Location.code == loc_data["code"]).first()
-        if not existing:
-            location = Location(**loc_data)
-            db.add(location)
-            count += 1
-    
+    # One set-based insert; codes that already exist are left untouched
+    stmt = pg_insert(Location).values(locations_data).on_conflict_do_nothing(index_elements=[Location.code])
+    count = db.execute(stmt).rowcount
     db.commit()
     print(f"✓ Added {count} locations")
 
@@ -136,15 +131,9 @@ def seed_categories(db: Session):
     ]
     
     print("Seeding categories...")
-    count = 0
-    for cat_data in categories_data:
-        # Check if category already exists
-        existing = db.query(Category).filter(Category.code == cat_data["code"]).first()
-        if not existing:
-            category = Category(**cat_data)
-            db.add(category)
-            count += 1
-    
+    # One set-based insert; codes that already exist are left untouched
+    stmt = pg_insert(Category).values(categories_data).on_conflict_do_nothing(index_elements=[Category.code])
+    count = db.execute(stmt).rowcount
     db.commit()
     print(f"✓ Added {count} categories")
 